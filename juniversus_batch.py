@@ -0,0 +1,112 @@
+# juniversus_batch.py
+# JUniversus — NumPy batch Monte Carlo for Multisport Best-of-5 series (no Tk, no sleeps, no output)
+# - Lineups only depend on the order the sports are drawn in (build_sport_team + usage limit), so every
+#   possible ordering is resolved once up front into per-sport exact win probabilities
+# - Each series then costs one ordering draw plus one uniform per sport, with the first-to-3 stop
+#   applied on arrays
+# - Ratings are frozen for the whole batch: no post-match tier drift is applied (offline balancing)
+# - planner=juniversus_lineup.plan_lineups evaluates the optimized lineups instead of the greedy ones
+# - NumPy is imported inside the functions, so importing this module (and the engine) stays cheap
+
+from itertools import permutations
+
+from juniversus_engine import (
+    sports, USAGE_LIMIT, MULTISPORT_SPORTS, MULTISPORT_TARGET,
+    build_sport_team, team_rating_by_weights, duel_rating_by_weights, traced,
+)
+from juniversus_odds import prob_from_gap, noise_width
+
+CHUNK = 1 << 18  # series per vectorized block; bounds peak memory
+
+def sport_win_prob(roster, sport_name, s1, s2):
+    cfg = sports[sport_name]
+    if cfg["type"] == "team":
+        r1 = team_rating_by_weights(roster, s1, cfg["weights"], sport_name)
+        r2 = team_rating_by_weights(roster, s2, cfg["weights"], sport_name)
+    else:
+        r1 = duel_rating_by_weights(roster, s1[0], cfg["weights"], sport_name)
+        r2 = duel_rating_by_weights(roster, s2[0], cfg["weights"], sport_name)
+    return prob_from_gap(r1 - r2, noise_width(sport_name))
+
+def series_table(roster, team1, team2, usage_limit=USAGE_LIMIT, planner=None):
+    # returns (sport_names, orders, probs): every possible sport ordering (rows of sport indexes) and
+    # P(team1 wins the sport at that position) under the lineups the live match would field
+    import numpy as np
+    sport_names = list(sports.keys())
+    if len(sport_names) >= MULTISPORT_SPORTS:
+        k = MULTISPORT_SPORTS
+        all_orders = permutations(range(len(sport_names)), k)
+    else:
+        k = len(sport_names)
+        all_orders = [tuple(range(k))]  # fewer sports than a series: all of them, in definition order
+    prefix_memo = {(): ({n:0 for n in set(team1+team2)}, [])}
+    orders = []; probs = []
+    if planner is not None:
+        # joint planners look at the whole draw, so each ordering is planned on its own
+        for order in all_orders:
+            drawn = [sport_names[i] for i in order]
+            lineups = planner(roster, drawn, team1, team2, usage_limit)
+            orders.append(order); probs.append([sport_win_prob(roster, s, s1, s2) for s, (s1, s2) in zip(drawn, lineups)])
+        return sport_names, np.array(orders, dtype=np.int8), np.array(probs, dtype=np.float64)
+    for order in all_orders:
+        # orderings sharing a prefix share lineups, so resolve each prefix once
+        for j in range(1, k+1):
+            key = order[:j]
+            if key in prefix_memo: continue
+            usage, path = prefix_memo[order[:j-1]]
+            sport_name = sport_names[order[j-1]]
+            s1 = build_sport_team(roster, sport_name, team1, usage, usage_limit)
+            s2 = build_sport_team(roster, sport_name, team2, usage, usage_limit)
+            usage = dict(usage)
+            for p in s1 + s2: usage[p] = usage.get(p,0) + 1
+            prefix_memo[key] = (usage, path + [sport_win_prob(roster, sport_name, s1, s2)])
+        orders.append(order); probs.append(prefix_memo[order][1])
+    return sport_names, np.array(orders, dtype=np.int8), np.array(probs, dtype=np.float64)
+
+@traced("batch_series")
+def simulate_series_batch(roster, team1, team2, n_series, seed=None, usage_limit=USAGE_LIMIT, planner=None):
+    # returns {"series", "team1_win_rate", "team2_win_rate", "tie_rate",
+    #          "sport_win_rates", "sport_play_rates", "score_distribution"}
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    sport_names, orders, probs = series_table(roster, team1, team2, usage_limit, planner)
+    n_orders, k = probs.shape
+    positions = np.arange(k)
+    wins1 = wins2 = 0
+    sport_played = np.zeros(len(sport_names)); sport_won = np.zeros(len(sport_names))
+    score_counts = np.zeros((k+1) * (k+1), dtype=np.int64)
+    done = 0
+    while done < n_series:
+        b = min(CHUNK, n_series - done)
+        idx = rng.integers(0, n_orders, b)
+        won = rng.random((b, k)) < probs[idx]
+        cs1 = np.cumsum(won, axis=1)
+        cs2 = (positions + 1) - cs1
+        reached = (cs1 >= MULTISPORT_TARGET) | (cs2 >= MULTISPORT_TARGET)
+        # first-to-3 stop; with fewer sports nobody may reach the target and the series runs out
+        stop = np.where(reached.any(axis=1), reached.argmax(axis=1), k-1)
+        played = positions[None, :] <= stop[:, None]
+        score1 = cs1[np.arange(b), stop]; score2 = stop + 1 - score1
+        wins1 += int(np.count_nonzero(score1 > score2)); wins2 += int(np.count_nonzero(score2 > score1))
+        cells = orders[idx][played]
+        sport_played += np.bincount(cells, minlength=len(sport_names))
+        sport_won += np.bincount(cells, weights=won[played], minlength=len(sport_names))
+        score_counts += np.bincount(score1 * (k+1) + score2, minlength=score_counts.size)
+        done += b
+    n = float(n_series) if n_series else 1.0
+    return {
+        "series": n_series,
+        "team1_win_rate": wins1 / n,
+        "team2_win_rate": wins2 / n,
+        "tie_rate": (n_series - wins1 - wins2) / n,
+        # team1's win rate in each sport, over the series in which that sport was actually played
+        "sport_win_rates": {s: (float(sport_won[i] / sport_played[i]) if sport_played[i] else None) for i, s in enumerate(sport_names)},
+        "sport_play_rates": {s: float(sport_played[i] / n) for i, s in enumerate(sport_names)},
+        "score_distribution": {f"{a}-{c}": int(score_counts[a*(k+1)+c]) / n for a in range(k+1) for c in range(k+1) if score_counts[a*(k+1)+c]},
+    }
+
+def simulate_series_batch_pairs(roster, pairs, n_series, seed=None, usage_limit=USAGE_LIMIT, planner=None):
+    # many (team1, team2) pairs; each pair gets its own child stream of the seed
+    import numpy as np
+    seeds = np.random.SeedSequence(seed).spawn(len(pairs))
+    return [simulate_series_batch(roster, t1, t2, n_series, s, usage_limit, planner) for (t1, t2), s in zip(pairs, seeds)]
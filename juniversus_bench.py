@@ -0,0 +1,180 @@
+# juniversus_bench.py
+# JUniversus — benchmark suite over synthetic rosters (no Tk, no sleeps)
+# - Builds official + community rosters with make_player_from_profile at each size (1k, 100k, 1M by
+#   default), seeded so every run sees the same players
+# - Times the hot paths (cold and cached ratings, build_sport_team, post-match drift per match and
+#   batched per season, roster build, JSON load/save of both files, cold start from JSON vs the binary
+#   snapshot) and end-to-end headless Multisport throughput
+# - Writes one JSON document per run; --compare flags benchmarks that got slower than a baseline run
+#
+#   python juniversus_bench.py --sizes 1000,100000 --out bench.json
+#   python juniversus_bench.py --sizes 1000 --compare bench.json
+
+import argparse, json, os, platform, random, subprocess, sys, tempfile, time
+
+from juniversus_engine import (
+    STAT_KEYS, TIER_ORDER, WEIGHT_CLASSES, sports, Roster, make_player_from_profile,
+    duel_rating_by_weights, team_rating_by_weights, build_sport_team, post_match_tier_drift,
+    simulate_multisport_match, load_official_players, save_official_players,
+    load_community_players, save_community_players,
+)
+from juniversus_drift import season_tier_drift
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+OFFICIAL_SHARE = 50      # one official player per 50 community players (at least MIN_OFFICIAL)
+MIN_OFFICIAL = 20
+TIER_WEIGHTS = (3, 5, 2, 1)  # D, B, A, S
+TOLERANCE = 0.15             # --compare: slower than baseline by more than this is a regression
+
+# ---------------------------
+# Synthetic rosters
+# ---------------------------
+def synthetic_players(n, official, rng, prefix):
+    players = {}
+    for i in range(n):
+        profile = {k: rng.choices(TIER_ORDER, TIER_WEIGHTS)[0] for k in STAT_KEYS}
+        players[f"{prefix} {i:07d}"] = make_player_from_profile(profile, rng.choice(WEIGHT_CLASSES), official, rng)
+    return players
+
+def synthetic_roster(size, seed=0):
+    # returns (official dict, community dict) with `size` players in total
+    rng = random.Random(seed)
+    n_official = min(size, max(MIN_OFFICIAL, size // OFFICIAL_SHARE))
+    return synthetic_players(n_official, True, rng, "Official"), synthetic_players(size - n_official, False, rng, "Community")
+
+# ---------------------------
+# Timing
+# ---------------------------
+def measure(fn, ops, repeat=3, setup=None):
+    # best of `repeat` runs of fn() (each doing `ops` operations); setup() runs untimed before each
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None: setup()
+        start = time.perf_counter(); fn(); best = min(best, time.perf_counter() - start)
+    return {"ops": ops, "seconds": best, "ns_per_op": best / ops * 1e9 if ops else 0.0,
+            "ops_per_sec": ops / best if best else 0.0}
+
+def bench_size(size, seed=0, repeat=3, matches=200, log=print):
+    results = []
+    def record(name, res):
+        res.update(name=name, size=size); results.append(res)
+        log(f"  {name:28s} {res['ns_per_op']:14,.0f} ns/op {res['ops_per_sec']:14,.1f} ops/s")
+
+    start = time.perf_counter()
+    official, community = synthetic_roster(size, seed)
+    log(f"size {size:,}: generated in {time.perf_counter() - start:.1f}s")
+    rng = random.Random(seed + 1)
+
+    record("roster_build", measure(lambda: Roster(official, community, official_file=None, players_file=None), size, repeat))
+    roster = Roster(official, community, official_file=None, players_file=None)
+    names = roster.names()
+    sample = [rng.choice(names) for _ in range(min(size, 20000))]
+    duel = "Boxing"; duel_w = sports[duel]["weights"]
+    team = "Basketball"; team_w = sports[team]["weights"]; team_size = sports[team]["team_size"]
+
+    def duel_ratings():
+        for n in sample: duel_rating_by_weights(roster, n, duel_w, duel)
+    record("duel_rating_cold", measure(duel_ratings, len(sample), repeat, setup=roster.refresh))
+    record("duel_rating_cached", measure(duel_ratings, len(sample), repeat))
+
+    lineups = [rng.sample(names, team_size) for _ in range(2000)]
+    def team_ratings():
+        for t in lineups: team_rating_by_weights(roster, t, team_w, team)
+    record("team_rating_cold", measure(team_ratings, len(lineups), repeat, setup=roster.refresh))
+    record("team_rating_cached", measure(team_ratings, len(lineups), repeat))
+
+    squads = [rng.sample(names, 20) for _ in range(500)]
+    def sport_teams():
+        for sq in squads: build_sport_team(roster, team, sq, {})
+    record("build_sport_team", measure(sport_teams, len(squads), repeat))
+
+    community_names = roster.names(False) or names
+    drift_pairs = [(rng.sample(community_names, 5), rng.sample(community_names, 5)) for _ in range(500)]
+    drift_rng = random.Random(seed + 2)
+    def drifts():
+        for w, l in drift_pairs: post_match_tier_drift(roster, w, l, "Multisport", set(w[:2]), rng=drift_rng)
+    record("post_match_tier_drift", measure(drifts, len(drift_pairs), repeat))
+    drift_batch = [(w, l, w[:2]) for w, l in drift_pairs]
+    record("season_tier_drift", measure(lambda: season_tier_drift(roster, drift_batch, seed=seed), len(drift_batch), repeat))
+
+    fixtures = [(rng.sample(names, 10), rng.sample(names, 10)) for _ in range(matches)]
+    def multisport(drift, narrate=True):
+        def run():
+            for i, (t1, t2) in enumerate(fixtures): simulate_multisport_match(roster, t1, t2, drift=drift, seed=i, narrate=narrate)
+        return run
+    record("multisport_match", measure(multisport(False), len(fixtures), repeat))
+    record("multisport_match_silent", measure(multisport(False, narrate=False), len(fixtures), repeat))
+    record("multisport_match_drift", measure(multisport(True), len(fixtures), repeat))
+
+    with tempfile.TemporaryDirectory() as d:
+        off_path = os.path.join(d, "official_players.json"); comm_path = os.path.join(d, "players.json")
+        record("save_official_players", measure(lambda: save_official_players(official, off_path), len(official), repeat))
+        record("load_official_players", measure(lambda: load_official_players(off_path), len(official), repeat))
+        record("save_community_players", measure(lambda: save_community_players(community, comm_path), max(1, len(community)), repeat))
+        record("load_community_players", measure(lambda: load_community_players(comm_path), max(1, len(community)), repeat))
+        for r in results[-4:]:
+            r["bytes"] = os.path.getsize(off_path if "official" in r["name"] else comm_path)
+        # cold start: parse both files vs map the binary snapshot written by the first snapshot load
+        record("from_files_json", measure(lambda: Roster.from_files(off_path, comm_path, snapshot=False), size, repeat))
+        Roster.from_files(off_path, comm_path)
+        record("from_files_snapshot", measure(lambda: Roster.from_files(off_path, comm_path), size, repeat))
+        results[-1]["bytes"] = os.path.getsize(comm_path + ".snapshot")
+    return results
+
+# ---------------------------
+# Results
+# ---------------------------
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run_suite(sizes=DEFAULT_SIZES, seed=0, repeat=3, matches=200, log=print):
+    doc = {"format": 1, "revision": git_revision(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+           "python": platform.python_version(), "platform": platform.platform(), "seed": seed,
+           "repeat": repeat, "results": []}
+    for size in sizes:
+        doc["results"] += bench_size(size, seed, repeat, matches, log)
+    return doc
+
+def compare(current, baseline, tolerance=TOLERANCE):
+    # [(name, size, baseline ns/op, current ns/op, ratio)] for every benchmark in both runs; ratio > 1 is slower
+    base = {(r["name"], r["size"]): r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        b = base.get((r["name"], r["size"]))
+        if b is None or not b["ns_per_op"]: continue
+        rows.append((r["name"], r["size"], b["ns_per_op"], r["ns_per_op"], r["ns_per_op"] / b["ns_per_op"]))
+    regressions = [row for row in rows if row[4] > 1 + tolerance]
+    return rows, regressions
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="JUniversus benchmark suite")
+    ap.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="comma-separated roster sizes")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3, help="best of N runs per benchmark")
+    ap.add_argument("--matches", type=int, default=200, help="Multisport matches per throughput run")
+    ap.add_argument("--out", default="bench_results.json", help="where to write the results document")
+    ap.add_argument("--compare", help="baseline results document to check for regressions")
+    ap.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = ap.parse_args(argv)
+    doc = run_suite([int(s) for s in args.sizes.split(",") if s], args.seed, args.repeat, args.matches)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2)
+    print(f"Results written to {args.out}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows, regressions = compare(doc, baseline, args.tolerance)
+        for name, size, old, new, ratio in rows:
+            flag = "  REGRESSION" if ratio > 1 + args.tolerance else ""
+            print(f"  {name:28s} {size:>9,} {old:14,.0f} -> {new:14,.0f} ns/op  x{ratio:.2f}{flag}")
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slower than baseline {baseline.get('revision')} by more than {args.tolerance:.0%}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
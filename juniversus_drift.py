@@ -0,0 +1,73 @@
+# juniversus_drift.py
+# JUniversus — batched post-match tier drift for season simulations
+# - Same rules as post_match_tier_drift (every community player of both teams re-rolls each stat in
+#   its tier, then may promote / demote; standouts get +0.18 promote / -0.06 demote; 6% chance to
+#   re-roll the specialization), applied to many matches at once on the table's tier and stat matrices
+# - Drift steps are split into waves in which no player appears twice; each wave is one set of array
+#   operations, and a player's steps still run in match order (a player listed on both sides of a
+#   match drifts twice, winner side first, as post_match_tier_drift does)
+# - The roster is touched and persisted once per batch instead of once per match
+# - Draws come from one NumPy generator per batch, so a batch replays from its seed but does not
+#   reproduce the per-match streams of match_drift_rng
+
+import numpy as np
+
+from juniversus_engine import TIER_RANGES, TIER_ORDER, NUM_STATS, choose_specialization_from_tiers, traced, current_tracer
+
+TIER_LO = np.array([TIER_RANGES.get(t, (1, 10))[0] for t in TIER_ORDER], dtype=np.int64)
+TIER_HI = np.array([TIER_RANGES.get(t, (1, 10))[1] for t in TIER_ORDER], dtype=np.int64)
+
+PROMOTE = (0.05, 0.12)        # loser, winner
+DEMOTE = (0.18, 0.05)
+STANDOUT_PROMOTE = 0.18
+STANDOUT_DEMOTE = 0.06
+SPEC_REROLL = 0.06
+
+def drift_waves(roster, results):
+    # results: (winners, losers, standouts) per match, in match order.
+    # Returns [(rows, is_winner, is_standout)] arrays per wave; only community players drift.
+    table = roster.table
+    last_wave = {}; waves = []
+    for winners, losers, standouts in results:
+        standouts = set(standouts or ())
+        for group, is_winner in ((winners, True), (losers, False)):
+            for name in group:
+                i = roster.row_of(name)
+                if i is None or table.official[i]: continue
+                w = last_wave[i] = last_wave.get(i, -1) + 1   # the wave after this player's previous step
+                if w == len(waves): waves.append(([], [], []))
+                rows, win, stand = waves[w]
+                rows.append(i); win.append(is_winner); stand.append(name in standouts)
+    return [(np.array(r, dtype=np.int64), np.array(w, dtype=bool), np.array(s, dtype=bool)) for r, w, s in waves]
+
+@traced("drift_batch")
+def season_tier_drift(roster, results, seed=None):
+    # applies the drift of every decided match in `results` and returns the names that drifted
+    rng = np.random.default_rng(seed)
+    waves = drift_waves(roster, results)   # resolves rows first: a lazily loaded roster may grow its table
+    table = roster.table
+    tiers = table.tier_matrix(); stats = table.stat_matrix()
+    drifted = set()
+    for rows, win, stand in waves:
+        k = len(rows)
+        t = tiers[rows].astype(np.int64)
+        new_stats = rng.integers(TIER_LO[t], TIER_HI[t] + 1)
+        promote = np.where(win, PROMOTE[1], PROMOTE[0]) + STANDOUT_PROMOTE * stand
+        demote = np.where(win, DEMOTE[1], DEMOTE[0]) - STANDOUT_DEMOTE * stand
+        up = rng.random((k, NUM_STATS)) < promote[:, None]
+        down = ~up & (rng.random((k, NUM_STATS)) < demote[:, None])
+        moved = up | down
+        new_t = np.clip(t + up - down, 0, len(TIER_ORDER) - 1)
+        # a promoted / demoted stat is re-rolled in its new tier
+        rerolled = rng.integers(TIER_LO[new_t], TIER_HI[new_t] + 1)
+        new_stats = np.where(moved, rerolled, np.clip(new_stats, 1, 10))
+        tiers[rows] = new_t; stats[rows] = new_stats
+        for i in rows[rng.random(k) < SPEC_REROLL]:
+            table.spec[i] = table.spec_code(choose_specialization_from_tiers(table.tiers_map(i)))
+        drifted.update(rows.tolist())
+    tr = current_tracer()
+    if tr is not None: tr.count("drift_rolls", sum(len(w[0]) for w in waves) * NUM_STATS)
+    names = [table.names[i] for i in sorted(drifted)]
+    roster.touch(names)
+    roster.persist(names)
+    return names
@@ -0,0 +1,1610 @@
+# juniversus_engine.py
+# JUniversus — headless simulation core (no Tk, no import-time disk I/O)
+# - Tier system, stats, specializations and sport definitions
+# - Roster object holding the official (protected) and community players; files are only touched when asked
+# - Rating, narrative, single-sport / Multisport simulation and post-match tier drift
+# - All output goes through a sink object so the same code drives the Tk app, batch workers and servers
+
+import random, json, os, time, threading, hashlib, bisect, itertools, collections, functools, gzip, string, mmap, struct
+
+# ---------------------------
+# Instrumentation: named spans and counters for the simulation, persistence and UI paths
+# Off by default: every call site checks the module-level `tracer` (None) first, so a disabled run pays
+# one global lookup per instrumented call. enable_tracing() (or JUNIVERSUS_TRACE=1) installs a Tracer:
+# - spans record inclusive and self time (time not spent in nested spans) with log2 histograms
+# - counters count things (ratings computed, drift rolls, bytes written, UI flushes, ...)
+# - each outermost span (a match, a batch call) also leaves a per-run breakdown of self time and
+#   counters in tracer.runs, so self times add up to the run's total
+# ---------------------------
+TRACE_RUNS_KEPT = 1000
+
+class NullSpan:
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+NULL_SPAN = NullSpan()
+
+class Span:
+    __slots__ = ("tracer", "name", "t0", "child")
+    def __init__(self, tracer, name):
+        self.tracer = tracer; self.name = name
+    def __enter__(self):
+        self.child = 0
+        self.tracer.local_stack().append(self)
+        self.t0 = time.perf_counter_ns()
+        return self
+    def __exit__(self, *exc):
+        self.tracer.close_span(self, time.perf_counter_ns() - self.t0)
+        return False
+
+class Tracer:
+    def __init__(self, runs_kept=TRACE_RUNS_KEPT):
+        self.lock = threading.Lock()
+        self.local = threading.local()   # per thread: open span stack and the current run's totals
+        self.spans = {}                  # name -> [count, inclusive ns, self ns, max ns, {log2 bucket: count}]
+        self.counters = collections.Counter()
+        self.runs = collections.deque(maxlen=runs_kept)
+
+    def local_stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        if not stack:
+            self.local.run_self = collections.Counter(); self.local.run_counters = collections.Counter()
+        return stack
+
+    def span(self, name):
+        return Span(self, name)
+
+    def close_span(self, span, elapsed):
+        stack = self.local.stack; stack.pop()
+        own = elapsed - span.child
+        if stack: stack[-1].child += elapsed
+        self.local.run_self[span.name] += own
+        with self.lock:
+            agg = self.spans.get(span.name)
+            if agg is None: agg = self.spans[span.name] = [0, 0, 0, 0, collections.Counter()]
+            agg[0] += 1; agg[1] += elapsed; agg[2] += own; agg[3] = max(agg[3], elapsed)
+            agg[4][elapsed.bit_length()] += 1
+            if not stack:
+                self.runs.append({"span": span.name, "total_ms": elapsed / 1e6,
+                                  "self_ms": {k: v / 1e6 for k, v in self.local.run_self.most_common()},
+                                  "counters": dict(self.local.run_counters)})
+
+    def count(self, name, n=1):
+        with self.lock: self.counters[name] += n
+        if getattr(self.local, "stack", None): self.local.run_counters[name] += n
+
+    def export(self):
+        # aggregate view: per span count / total / self time, quantiles and the log2 histogram
+        spans = {}
+        with self.lock:
+            for name, (count, total, own, peak, hist) in sorted(self.spans.items()):
+                buckets = sorted(hist.items())
+                def quantile(q):
+                    seen = 0
+                    for b, c in buckets:
+                        seen += c
+                        if seen >= q * count: return (1 << b) / 1e3  # upper edge of the bucket, in us
+                    return peak / 1e3
+                spans[name] = {"count": count, "total_ms": total / 1e6, "self_ms": own / 1e6, "mean_us": total / count / 1e3,
+                               "p50_us": quantile(0.5), "p90_us": quantile(0.9), "p99_us": quantile(0.99), "max_us": peak / 1e3,
+                               "histogram_us": {str((1 << b) / 1e3): c for b, c in buckets}}
+            return {"spans": spans, "counters": dict(self.counters), "runs": len(self.runs)}
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.export(), f, indent=2)
+
+    def format_run(self, run=None):
+        # text breakdown of one run (the latest by default)
+        run = run if run is not None else (self.runs[-1] if self.runs else None)
+        if run is None: return "(no traced runs)\n"
+        lines = [f"{run['span']}: {run['total_ms']:.3f} ms"]
+        for name, ms in run["self_ms"].items():
+            lines.append(f"  {name:16s} {ms:10.3f} ms  {ms / run['total_ms'] * 100 if run['total_ms'] else 0:5.1f}%")
+        for name, n in sorted(run["counters"].items()):
+            lines.append(f"  #{name:15s} {n}")
+        return "\n".join(lines) + "\n"
+
+tracer = None
+
+def enable_tracing(runs_kept=TRACE_RUNS_KEPT):
+    global tracer
+    tracer = Tracer(runs_kept)
+    return tracer
+
+def disable_tracing():
+    global tracer
+    tracer = None
+
+def current_tracer():
+    return tracer
+
+def trace_span(name):
+    # `with trace_span("x"):` for call sites that are not hot enough to hand-inline the tracer check
+    return tracer.span(name) if tracer is not None else NULL_SPAN
+
+def traced(name):
+    # decorator: the whole call is one span (disabled cost: one extra call and a None check)
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if tracer is None: return fn(*args, **kwargs)
+            with tracer.span(name): return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+if os.environ.get("JUNIVERSUS_TRACE"): enable_tracing()
+
+# ---------------------------
+# Files: official roster (protected) and community players (editable)
+# ---------------------------
+OFFICIAL_PLAYERS_FILE = "official_players.json"
+PLAYERS_FILE = "players.json"   # community players
+
+# ---------------------------
+# Tier system & ranges
+# ---------------------------
+TIER_RANGES = {
+    "D": (1, 4),
+    "B": (5, 7),
+    "A": (7, 9),
+    "S": (9, 10)
+}
+TIER_ORDER = ["D", "B", "A", "S"]
+
+# ---------------------------
+# Match RNG: seeded, splittable random streams
+# Every simulation function takes an `rng` (anything with the random-module API; the global
+# `random` module by default). A MatchRNG child stream is derived from the root seed and a label
+# path only, never from how much the parent has been used, so a match replays bit-for-bit from its
+# seed and independent parts (sports, drift, parallel fixtures) never share state.
+# ---------------------------
+def derive_seed(seed, path):
+    digest = hashlib.blake2b(repr((seed, path)).encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest, "big")
+
+class MatchRNG(random.Random):
+    def __init__(self, seed=None, path=()):
+        if seed is None: seed = random.SystemRandom().getrandbits(64)
+        self.root_seed = seed; self.path = tuple(path)
+        super().__init__(derive_seed(seed, self.path))
+
+    def spawn(self, *labels):
+        return MatchRNG(self.root_seed, self.path + tuple(str(l) for l in labels))
+
+def stat_value_within_tier(tier, rng=random):
+    lo, hi = TIER_RANGES.get(tier, (1, 10))
+    return rng.randint(lo, hi)
+
+def tier_index_of(tier):
+    try:
+        return TIER_ORDER.index(tier)
+    except ValueError:
+        return 1  # default B
+
+def tier_up(tier):
+    idx = tier_index_of(tier)
+    if idx < len(TIER_ORDER)-1:
+        return TIER_ORDER[idx+1]
+    return tier
+
+def tier_down(tier):
+    idx = tier_index_of(tier)
+    if idx > 0:
+        return TIER_ORDER[idx-1]
+    return tier
+
+# ---------------------------
+# Stats & specializations
+# ---------------------------
+STAT_KEYS = ["power", "speed", "stamina", "accuracy", "defense", "clutch", "teamwork"]
+STAT_INDEX = {k: i for i, k in enumerate(STAT_KEYS)}
+
+WEIGHT_CLASSES = ["Flyweight", "Lightweight", "Middleweight", "Light-Heavy", "Heavyweight"]
+WEIGHT_CLASS_MOD = {
+    "Flyweight": 0.95,
+    "Lightweight": 0.98,
+    "Middleweight": 1.00,
+    "Light-Heavy": 1.03,
+    "Heavyweight": 1.06
+}
+
+SPECIALIZATIONS = {
+    "Playmaker": {"boost": {"teamwork": 0.12, "accuracy": 0.06}, "favored_sports": ["Basketball", "Soccer", "Tennis"]},
+    "Sniper":    {"boost": {"accuracy": 0.15, "clutch": 0.06}, "favored_sports": ["Basketball", "Tennis", "Soccer"]},
+    "Defender":  {"boost": {"defense": 0.15, "stamina": 0.06}, "favored_sports": ["Wrestling", "Boxing", "Soccer"]},
+    "Powerhouse":{"boost": {"power": 0.18, "stamina": 0.05}, "favored_sports": ["Boxing", "Wrestling", "Basketball"]},
+    "Speedster": {"boost": {"speed": 0.18, "clutch": 0.04}, "favored_sports": ["Tennis", "Soccer", "Basketball"]},
+    "Balanced":  {"boost": {}, "favored_sports": ["Basketball","Boxing","Tennis","Wrestling","Soccer"]}
+}
+
+def choose_specialization_from_tiers(tiers_map):
+    rank_map = {k: tier_index_of(tiers_map.get(k, "B")) for k in STAT_KEYS}
+    max_rank = max(rank_map.values())
+    top_stats = [k for k,v in rank_map.items() if v == max_rank]
+    if "teamwork" in top_stats: return "Playmaker"
+    if "accuracy" in top_stats and "clutch" in top_stats: return "Sniper"
+    if "defense" in top_stats or "stamina" in top_stats: return "Defender"
+    if "power" in top_stats: return "Powerhouse"
+    if "speed" in top_stats: return "Speedster"
+    return "Balanced"
+
+# ---------------------------
+# Helper: create player dict from tier profile
+# Each player record structure:
+# {
+#   "tiers": {...}, "stats": {...}, "weight_class": str,
+#   "specialization": str, "official": bool
+# }
+# ---------------------------
+def make_player_from_profile(profile_tiers, wc="Middleweight", official=False, rng=random):
+    tiers_map = {k: profile_tiers.get(k, "B") for k in STAT_KEYS}
+    stats = {k: stat_value_within_tier(tiers_map[k], rng) for k in STAT_KEYS}
+    spec = choose_specialization_from_tiers(tiers_map)
+    return {"tiers": tiers_map, "stats": stats, "weight_class": wc, "specialization": spec, "official": official}
+
+# ---------------------------
+# Default official players (used to seed official file if missing)
+# ---------------------------
+DEFAULT_PLAYERS = {
+    "LeBron James": make_player_from_profile({"power":"A","speed":"A","stamina":"S","accuracy":"A","defense":"A","clutch":"S","teamwork":"S"}, "Heavyweight", official=True),
+    "Michael Jordan": make_player_from_profile({"power":"S","speed":"S","stamina":"A","accuracy":"S","defense":"A","clutch":"S","teamwork":"A"}, "Lightweight", official=True),
+    "Kobe Bryant": make_player_from_profile({"power":"A","speed":"A","stamina":"A","accuracy":"S","defense":"A","clutch":"S","teamwork":"B"}, "Lightweight", official=True),
+    "Muhammad Ali": make_player_from_profile({"power":"A","speed":"S","stamina":"S","accuracy":"A","defense":"A","clutch":"A","teamwork":"B"}, "Middleweight", official=True),
+    "Mike Tyson": make_player_from_profile({"power":"S","speed":"A","stamina":"B","accuracy":"A","defense":"B","clutch":"B","teamwork":"D"}, "Light-Heavy", official=True),
+    "Roger Federer": make_player_from_profile({"power":"B","speed":"A","stamina":"S","accuracy":"S","defense":"A","clutch":"A","teamwork":"B"}, "Lightweight", official=True),
+    "Rafael Nadal": make_player_from_profile({"power":"A","speed":"A","stamina":"S","accuracy":"A","defense":"A","clutch":"S","teamwork":"B"}, "Lightweight", official=True),
+    "Novak Djokovic": make_player_from_profile({"power":"A","speed":"A","stamina":"S","accuracy":"S","defense":"S","clutch":"A","teamwork":"B"}, "Lightweight", official=True),
+    "Shaq": make_player_from_profile({"power":"S","speed":"D","stamina":"D","accuracy":"D","defense":"A","clutch":"B","teamwork":"A"}, "Heavyweight", official=True),
+    "Stephen Curry": make_player_from_profile({"power":"D","speed":"A","stamina":"A","accuracy":"S","defense":"B","clutch":"A","teamwork":"B"}, "Lightweight", official=True),
+    "Generic Star": make_player_from_profile({"power":"B","speed":"B","stamina":"B","accuracy":"B","defense":"B","clutch":"B","teamwork":"B"}, "Middleweight", official=True)
+}
+
+# ---------------------------
+# Sports definitions
+# (same as before; Soccer included)
+# ---------------------------
+sports = {
+    "Basketball": {
+        "icon": "🏀", "type": "team", "team_size": 5,
+        "weights": {"power":0.30,"defense":0.25,"accuracy":0.15,"stamina":0.15,"clutch":0.10,"teamwork":0.05},
+        "narratives": [
+            "{p1} isolates, sizes up the defender and knocks down a mid-range jumper — pure footwork.",
+            "{p2} drives baseline and finishes with a tomahawk dunk off the glass!",
+            "{p1} calls for the pick-and-roll: the roller slips to the rim for an easy layup."
+        ]
+    },
+    "Boxing": {
+        "icon": "🥊", "type": "duel",
+        "rounds_default": 12, "rounds_options":[4,8,10,12],
+        "weights": {"power":0.40,"defense":0.25,"stamina":0.25,"accuracy":0.10},
+        "narratives":[
+            "{p1} opens with a probing jab — testing range and timing.",
+            "{p2} feints low then lands a sharp counter right hand."
+        ]
+    },
+    "Tennis": {
+        "icon":"🎾", "type":"duel",
+        "sets_default":3, "sets_options":[3,5],
+        "weights":{"speed":0.35,"accuracy":0.30,"stamina":0.25,"clutch":0.10},
+        "narratives":[
+            "{p1} serves an ace down the T— pinpoint placement.",
+            "{p2} returns with heavy topspin that pushes {p1} wide."
+        ]
+    },
+    "Wrestling": {
+        "icon":"🤼", "type":"duel", "rounds_default":5, "rounds_options":[1,3,5],
+        "weights":{"power":0.35,"speed":0.25,"stamina":0.25,"defense":0.10,"clutch":0.05},
+        "narratives":[
+            "{p1} shoots for a single-leg takedown and drives through for 2 points!",
+            "{p2} counters with a slick reversal — control switches!"
+        ]
+    },
+    "Soccer": {
+        "icon":"⚽", "type":"team", "team_size":7, "match_minutes":90,
+        "weights":{"teamwork":0.30,"stamina":0.25,"accuracy":0.20,"speed":0.15,"power":0.06,"defense":0.04},
+        "narratives":[
+            "{p1} threads a perfect through ball — the attack is on!",
+            "{p2} makes a last-ditch sliding tackle to deny the chance."
+        ]
+    }
+}
+
+# noise added to each side's rating before the winner comparison
+TEAM_NOISE = 10
+DUEL_NOISE = 12
+
+# Multisport: best of MULTISPORT_SPORTS sports, first to MULTISPORT_TARGET wins;
+# a player may appear in at most USAGE_LIMIT sports of one series
+MULTISPORT_SPORTS = 5
+MULTISPORT_TARGET = 3
+USAGE_LIMIT = 2
+
+# ---------------------------
+# Persistence: load/write official roster (protected) & community players
+# ---------------------------
+def load_official_players(path=OFFICIAL_PLAYERS_FILE):
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # ensure structure
+            fixed = {}
+            for name, rec in data.items():
+                tiers = rec.get("tiers", {k:"B" for k in STAT_KEYS})
+                stats = {k:int(rec.get("stats",{}).get(k, stat_value_within_tier(tiers.get(k,"B")))) for k in STAT_KEYS}
+                wc = rec.get("weight_class","Middleweight")
+                spec = rec.get("specialization", choose_specialization_from_tiers(tiers))
+                fixed[name] = {"tiers":tiers,"stats":stats,"weight_class":wc,"specialization":spec,"official":True}
+            return fixed
+        except Exception as e:
+            print("Failed to load official players:", e)
+    # write defaults
+    save_official_players(DEFAULT_PLAYERS, path)
+    return {k:v.copy() for k,v in DEFAULT_PLAYERS.items()}
+
+def save_official_players(pdict, path=OFFICIAL_PLAYERS_FILE):
+    # Write official file if it doesn't exist; do not allow overwriting via UI
+    try:
+        tmp = path + ".tmp"
+        with trace_span("save_json"), open(tmp, "w", encoding="utf-8") as f:
+            json.dump(pdict, f, indent=2)
+            if tracer is not None: tracer.count("bytes_written", f.tell())
+        os.replace(tmp, path)
+    except Exception as e:
+        print("Error saving official players:", e)
+
+def load_community_players(path=PLAYERS_FILE):
+    fixed = {}
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for name, rec in data.items():
+                # community players are expected in upgraded structure; if legacy, attempt migration (same as earlier logic)
+                tiers = rec.get("tiers", {k:"B" for k in STAT_KEYS})
+                stats = {k:int(rec.get("stats",{}).get(k, stat_value_within_tier(tiers.get(k,"B")))) for k in STAT_KEYS}
+                wc = rec.get("weight_class","Middleweight")
+                spec = rec.get("specialization", choose_specialization_from_tiers(tiers))
+                fixed[name] = {"tiers":tiers,"stats":stats,"weight_class":wc,"specialization":spec,"official":False}
+        except Exception as e:
+            print("Failed loading community players:", e)
+            fixed = {}
+    # changes made since the last snapshot live in the journal(s); empty if missing
+    replay_community_journal(fixed, path + JOURNAL_SUFFIX + ".old")
+    replay_community_journal(fixed, path + JOURNAL_SUFFIX)
+    return fixed
+
+def save_community_players(pdict, path=PLAYERS_FILE):
+    try:
+        tmp = path + ".tmp"
+        with trace_span("save_json"), open(tmp, "w", encoding="utf-8") as f:
+            json.dump(pdict, f, indent=2)
+            if tracer is not None: tracer.count("bytes_written", f.tell())
+        os.replace(tmp, path)
+    except Exception as e:
+        print("Error saving community players:", e)
+
+# ---------------------------
+# Community journal: append-only per-player delta records next to players.json
+# Each line is the full current state of one player in compact form
+#   {"n": name, "t": "BBADBBS", "s": [5,6,...], "w": weight_class, "p": specialization}
+# or {"n": name, "del": 1}, so replay is idempotent and the last line for a name wins.
+# Compaction rotates the journal to <journal>.old, writes a fresh players.json snapshot
+# (tmp + os.replace, as always) in a background thread, then drops the .old file. `generation` counts
+# compactions and `compacting` is set until the snapshot is written, so a PlayersFileWatcher can tell
+# our own rewrite of players.json from someone else's.
+# ---------------------------
+JOURNAL_SUFFIX = ".journal"
+
+def journal_line_to_record(entry):
+    return {"tiers": dict(zip(STAT_KEYS, entry["t"])), "stats": dict(zip(STAT_KEYS, entry["s"])),
+            "weight_class": entry.get("w", "Middleweight"), "specialization": entry.get("p", "Balanced"), "official": False}
+
+def replay_community_journal(pdict, journal_path):
+    if not os.path.exists(journal_path): return pdict
+    with open(journal_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn tail from a crash mid-append; everything before it is intact
+            if entry.get("del"): pdict.pop(entry["n"], None)
+            else: pdict[entry["n"]] = journal_line_to_record(entry)
+    return pdict
+
+def drop_torn_tail(path):
+    # a crash mid-append leaves a last line without its newline; replay skips it, but the next append
+    # would land on the same line and be skipped with it, so cut the file back to its last full line
+    try:
+        f = open(path, "r+b")
+    except FileNotFoundError:
+        return
+    with f:
+        end = f.seek(0, os.SEEK_END); pos = end
+        while pos > 0:
+            start = max(0, pos - 4096); f.seek(start)
+            nl = f.read(pos - start).rfind(b"\n")
+            if nl >= 0: pos = start + nl + 1; break
+            pos = start
+        if pos < end:
+            f.truncate(pos); f.flush(); os.fsync(f.fileno())
+
+class CommunityJournal:
+    def __init__(self, players_file=PLAYERS_FILE, group_size=64, group_interval=1.0, compact_bytes=8 << 20):
+        self.players_file = players_file
+        self.path = players_file + JOURNAL_SUFFIX
+        self.old_path = self.path + ".old"
+        self.group_size = group_size; self.group_interval = group_interval
+        self.compact_bytes = compact_bytes
+        self.lock = threading.Lock()
+        self.pending = 0; self.last_sync = time.monotonic()
+        self.compactor = None
+        self.generation = 0; self.compacting = False
+        drop_torn_tail(self.path)
+        self.f = open(self.path, "a", encoding="utf-8")
+
+    def append(self, roster, name):
+        # record the current state of `name` (or its deletion) from the roster table
+        table = roster.table
+        i = roster.row_of(name)
+        if i is None or table.official[i]:
+            entry = {"n": name, "del": 1}
+        else:
+            entry = {"n": name, "t": "".join(TIER_ORDER[c] for c in table.tier_row(i)), "s": list(table.stat_row(i)),
+                     "w": table.wc_names[table.wc[i]], "p": table.spec_names[table.spec[i]]}
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        if tracer is not None: tracer.count("journal_bytes", len(line))
+        with self.lock:
+            self.f.write(line)
+            self.pending += 1
+            # group commit: one fsync per group_size records or group_interval seconds
+            if self.pending >= self.group_size or time.monotonic() - self.last_sync >= self.group_interval:
+                self._sync()
+
+    def _sync(self):
+        with trace_span("journal_fsync"):
+            self.f.flush(); os.fsync(self.f.fileno())
+        self.pending = 0; self.last_sync = time.monotonic()
+
+    def flush(self):
+        with self.lock:
+            if self.pending: self._sync()
+
+    def size(self):
+        with self.lock:
+            return self.f.tell()
+
+    def maybe_compact(self, roster):
+        if self.size() >= self.compact_bytes:
+            self.compact(roster)
+
+    def compact(self, roster, background=True):
+        if self.compactor is not None and self.compactor.is_alive():
+            return self.compactor
+        with self.lock:
+            self.generation += 1; self.compacting = True
+            if os.path.exists(self.old_path):
+                # leftover from an interrupted compaction: already replayed into the roster, so the
+                # snapshot below covers it; append the live journal so nothing newer is lost meanwhile
+                self._sync(); self.f.close()
+                with open(self.path, "r", encoding="utf-8") as src, open(self.old_path, "a", encoding="utf-8") as dst:
+                    dst.write(src.read()); dst.flush(); os.fsync(dst.fileno())
+                os.remove(self.path)
+            else:
+                self._sync(); self.f.close()
+                os.replace(self.path, self.old_path)
+            self.f = open(self.path, "a", encoding="utf-8")
+            # the records to write, copied before anything else can be appended: anything changed from
+            # here on is in the new journal and replays over the snapshot
+            records = roster.community_records()
+        def write_snapshot():
+            try:
+                save_community_players(records, self.players_file)
+                try: os.remove(self.old_path)
+                except OSError: pass
+            finally:
+                self.compacting = False
+        if not background:
+            write_snapshot(); return None
+        self.compactor = threading.Thread(target=write_snapshot, daemon=True)
+        self.compactor.start()
+        return self.compactor
+
+    def close(self):
+        if self.compactor is not None: self.compactor.join()
+        with self.lock:
+            if not self.f.closed:
+                self._sync(); self.f.close()
+
+# ---------------------------
+# PlayerTable: struct-of-arrays storage for the merged roster
+# One row per player with byte columns (stats, tier codes, weight class / specialization / official codes).
+# Row indexes are stable: deleting a player only clears its row. Columns are never resized in place, so
+# NumPy views from stat_matrix()/tier_matrix() stay valid (and see in-place updates) until the next insert.
+# ---------------------------
+NUM_STATS = len(STAT_KEYS)
+TABLE_COLUMNS = (("stats", NUM_STATS), ("tiers", NUM_STATS), ("wc", 1), ("spec", 1), ("official", 1), ("alive", 1))
+
+_numpy = False
+
+def numpy_module():
+    # NumPy is imported on first use rather than with the engine (it costs ~0.1 s at startup);
+    # None when it is not installed: the table works without it, only the matrix views need it
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
+class PlayerTable:
+    def __init__(self, capacity=64):
+        self.names = []   # row -> name (None once deleted)
+        self.index = {}   # name -> row
+        self.n = 0; self.cap = max(1, capacity)
+        self.stats = bytearray(self.cap * NUM_STATS)
+        self.tiers = bytearray(self.cap * NUM_STATS)   # codes into TIER_ORDER
+        self.wc = bytearray(self.cap)                   # codes into wc_names
+        self.spec = bytearray(self.cap)                 # codes into spec_names
+        self.official = bytearray(self.cap)
+        self.alive = bytearray(self.cap)
+        self.wc_names = list(WEIGHT_CLASSES); self.wc_codes = {w:i for i,w in enumerate(self.wc_names)}
+        self.spec_names = list(SPECIALIZATIONS); self.spec_codes = {s:i for i,s in enumerate(self.spec_names)}
+
+    @classmethod
+    def attach(cls, names, columns, wc_names, spec_names):
+        # a fixed-size table over existing buffers (e.g. memoryviews into shared memory), one per TABLE_COLUMNS entry
+        t = cls.__new__(cls)
+        t.names = list(names); t.index = {n:i for i,n in enumerate(t.names) if n is not None}
+        t.n = t.cap = len(t.names)
+        for col, _ in TABLE_COLUMNS: setattr(t, col, columns[col])
+        t.wc_names = list(wc_names); t.wc_codes = {w:i for i,w in enumerate(t.wc_names)}
+        t.spec_names = list(spec_names); t.spec_codes = {sp:i for i,sp in enumerate(t.spec_names)}
+        return t
+
+    def _grow(self):
+        # allocate new columns instead of resizing, so outstanding buffer views never block growth
+        cap = max(1, self.cap * 2)
+        for col, width in TABLE_COLUMNS:
+            new = bytearray(cap * width); old = getattr(self, col)
+            new[:len(old)] = old
+            setattr(self, col, new)
+        self.cap = cap
+
+    def wc_code(self, wc):
+        code = self.wc_codes.get(wc)
+        if code is None:  # keep unknown labels round-trippable
+            code = self.wc_codes[wc] = len(self.wc_names); self.wc_names.append(wc)
+        return code
+
+    def spec_code(self, spec):
+        code = self.spec_codes.get(spec)
+        if code is None:
+            code = self.spec_codes[spec] = len(self.spec_names); self.spec_names.append(spec)
+        return code
+
+    def set_row(self, i, rec, official):
+        base = i * NUM_STATS
+        tiers = rec.get("tiers", {}); stats = rec.get("stats", {})
+        for s, k in enumerate(STAT_KEYS):
+            self.tiers[base+s] = tier_index_of(tiers.get(k, "B"))
+            self.stats[base+s] = max(0, min(255, int(stats.get(k, 0))))
+        self.wc[i] = self.wc_code(rec.get("weight_class", "Middleweight"))
+        self.spec[i] = self.spec_code(rec.get("specialization", "Balanced"))
+        self.official[i] = 1 if official else 0
+        self.alive[i] = 1
+
+    def upsert(self, name, rec, official):
+        i = self.index.get(name)
+        if i is None:
+            if self.n == self.cap: self._grow()
+            i = self.n; self.n += 1
+            self.names.append(name); self.index[name] = i
+        self.set_row(i, rec, official)
+        return i
+
+    def remove(self, name):
+        i = self.index.pop(name, None)
+        if i is None: return None
+        self.names[i] = None; self.alive[i] = 0
+        return i
+
+    def stat_row(self, i):
+        return tuple(self.stats[i*NUM_STATS:(i+1)*NUM_STATS])
+
+    def tier_row(self, i):
+        return tuple(self.tiers[i*NUM_STATS:(i+1)*NUM_STATS])
+
+    def tiers_map(self, i):
+        return {k: TIER_ORDER[c] for k, c in zip(STAT_KEYS, self.tier_row(i))}
+
+    def record(self, i):
+        # a fresh dict in the classic player-record shape; edits to it do not write back
+        return {"tiers": self.tiers_map(i), "stats": dict(zip(STAT_KEYS, self.stat_row(i))),
+                "weight_class": self.wc_names[self.wc[i]], "specialization": self.spec_names[self.spec[i]],
+                "official": bool(self.official[i])}
+
+    def stat_matrix(self):
+        np = numpy_module()
+        return np.frombuffer(self.stats, dtype=np.uint8, count=self.n*NUM_STATS).reshape(self.n, NUM_STATS)
+
+    def tier_matrix(self):
+        np = numpy_module()
+        return np.frombuffer(self.tiers, dtype=np.uint8, count=self.n*NUM_STATS).reshape(self.n, NUM_STATS)
+
+    def column(self, col):
+        np = numpy_module()
+        return np.frombuffer(getattr(self, col), dtype=np.uint8, count=self.n)
+
+class RosterView:
+    # read-only name -> record mapping over a roster's table (optionally only official or only community rows)
+    def __init__(self, roster, official=None):
+        self.roster = roster; self.official = official
+    def _row(self, name):
+        i = self.roster.row_of(name)
+        if i is None or (self.official is not None and bool(self.roster.table.official[i]) != self.official): return None
+        return i
+    def __getitem__(self, name):
+        i = self._row(name)
+        if i is None: raise KeyError(name)
+        return self.roster.table.record(i)
+    def get(self, name, default=None):
+        i = self._row(name)
+        return default if i is None else self.roster.table.record(i)
+    def __contains__(self, name):
+        return self._row(name) is not None
+    def __iter__(self):
+        return iter(self.roster.names(self.official))
+    def keys(self):
+        return list(self)
+    def items(self):
+        return [(n, self[n]) for n in self]
+    def values(self):
+        return [self[n] for n in self]
+    def __len__(self):
+        if self.official is None: return len(self.roster)
+        return len(self.roster.names(self.official))
+
+# ---------------------------
+# Player search: type-ahead over roster names
+# Case-folded names are kept sorted, split by official flag so official players come first: prefix
+# matches are a bisect range, substring matches a str.find scan over the sorted names joined into one
+# string, so both come out in name order and stop as soon as a page is full. The index follows the
+# PlayerTable incrementally: new rows are picked up on the next query, deleted names are skipped, and
+# the Roster re-files a name whose official flag changes (a community entry shadowing an official one).
+# ---------------------------
+SEARCH_LIMIT = 50
+
+class NameIndex:
+    def __init__(self, table):
+        self.table = table
+        self.rows_seen = 0
+        self.indexed = {}   # name -> official flag it is filed under
+        self.sorted = {True: [], False: []}   # official flag when indexed -> sorted [(folded name, name)]
+        self.joined = {True: None, False: None}  # flag -> ("\n".join(folded names), start offsets); None = stale
+        self.sync()
+
+    def sync(self):
+        t = self.table
+        if t.n == self.rows_seen: return
+        new = {True: [], False: []}
+        for i in range(self.rows_seen, t.n):
+            name = t.names[i]
+            if name is None: continue
+            if name in self.indexed: self.update([name]); continue  # re-added after a delete
+            self.indexed[name] = bool(t.official[i])
+            new[bool(t.official[i])].append((name.casefold(), name))
+        self.rows_seen = t.n
+        for flag, items in new.items():
+            if not items: continue
+            lst = self.sorted[flag]
+            if len(items) > 64:
+                lst.extend(items); lst.sort()
+            else:
+                for item in items: bisect.insort(lst, item)
+            self.joined[flag] = None
+
+    def update(self, names):
+        # moves names whose official flag differs from the one they were filed under
+        t = self.table
+        for name in names:
+            i = t.index.get(name); flag = self.indexed.get(name)
+            if i is None or flag is None or bool(t.official[i]) == flag: continue
+            item = (name.casefold(), name); lst = self.sorted[flag]
+            del lst[bisect.bisect_left(lst, item)]
+            bisect.insort(self.sorted[not flag], item); self.indexed[name] = not flag
+            self.joined[True] = self.joined[False] = None
+
+    def _joined(self, flag):
+        if self.joined[flag] is None:
+            folded = [f for f, _ in self.sorted[flag]]
+            offsets = list(itertools.accumulate((len(f) + 1 for f in folded), initial=0))[:-1]
+            self.joined[flag] = ("\n".join(folded), offsets)
+        return self.joined[flag]
+
+    def accepts(self, name, official, weight_class, specialization):
+        t = self.table; i = t.index.get(name)
+        if i is None: return False  # deleted since it was indexed
+        if official is not None and bool(t.official[i]) != official: return False
+        if weight_class is not None and t.wc_names[t.wc[i]] != weight_class: return False
+        if specialization is not None and t.spec_names[t.spec[i]] != specialization: return False
+        return True
+
+    def search(self, query, official=None, weight_class=None, specialization=None, limit=SEARCH_LIMIT):
+        # up to `limit` names: official before community, prefix matches before substring matches, by name
+        self.sync()
+        q = query.strip().casefold()
+        out = []
+        for flag in ((True, False) if official is None else (official,)):
+            lst = self.sorted[flag]
+            j = bisect.bisect_left(lst, (q,))
+            while j < len(lst) and len(out) < limit and lst[j][0].startswith(q):
+                if self.accepts(lst[j][1], official, weight_class, specialization): out.append(lst[j][1])
+                j += 1
+            if not q or "\n" in q: continue
+            text, offsets = self._joined(flag)
+            pos = text.find(q)
+            while pos >= 0 and len(out) < limit:
+                j = bisect.bisect_right(offsets, pos) - 1
+                name = lst[j][1]
+                if pos != offsets[j] and self.accepts(name, official, weight_class, specialization): out.append(name)
+                # continue after this name: one hit per name
+                nxt = offsets[j+1] if j + 1 < len(offsets) else len(text)
+                pos = text.find(q, nxt)
+        return out
+
+# ---------------------------
+# Roster: official + community players over one PlayerTable
+# Nothing is read or written until from_files()/save_community() is called explicitly.
+# With a journal attached, per-player changes are appended to it instead of rewriting players.json.
+# `merged` and `community` are read-only views; change players through the methods below.
+# `official` stays a plain dict: it is small, protected, and needed to un-shadow a deleted community entry.
+# Per-(player, sport) effective ratings are cached and checked against a per-player version;
+# anything that changes a player's row must go through the methods below or call touch().
+# touch()/refresh() also bump `version` and call the subscribe()d callbacks, so views refresh on change
+# instead of polling.
+# ---------------------------
+class Roster:
+    def __init__(self, official=None, community=None, official_file=OFFICIAL_PLAYERS_FILE, players_file=PLAYERS_FILE, journal=None, table=None):
+        self.official = official if official is not None else {}
+        self.official_file = official_file
+        self.players_file = players_file
+        self.journal = journal
+        self.version = 0
+        self.player_versions = {}
+        self.rating_cache = {}
+        community = community or {}
+        if table is not None:
+            self.table = table  # already populated (shared-memory worker views, snapshots)
+        else:
+            self.table = PlayerTable(len(self.official) + len(community))
+            for name, rec in self.official.items(): self.table.upsert(name, rec, True)
+            # community overlays official on a name clash, as the merged dict always did
+            for name, rec in community.items(): self.table.upsert(name, rec, False)
+        self.merged = RosterView(self)
+        self.community = RosterView(self, official=False)
+        self.search_index = None  # built on the first search()
+        self.subscribers = []
+
+    @classmethod
+    def from_files(cls, official_file=OFFICIAL_PLAYERS_FILE, players_file=PLAYERS_FILE, journaled=False, snapshot=True):
+        # snapshot=True starts from the binary snapshot next to players.json when it is still current,
+        # and writes a new one whenever the JSON files had to be parsed
+        roster = load_roster_snapshot(cls, official_file, players_file) if snapshot else None
+        if roster is None:
+            sources = snapshot_sources(official_file, players_file) if snapshot else None
+            roster = cls(load_official_players(official_file), load_community_players(players_file), official_file, players_file)
+            if snapshot:
+                # the loader writes defaults when the official file is missing
+                sources["official"] = file_signature(official_file); sources["digests"]["official"] = file_digest(official_file)
+                write_roster_snapshot(roster, sources)
+        if journaled:
+            roster.journal = CommunityJournal(players_file)
+            if os.path.exists(roster.journal.old_path):
+                roster.journal.compact(roster, background=False)  # finish an interrupted compaction
+        return roster
+
+    def refresh(self):
+        # drop every cached rating (e.g. after editing table columns directly in bulk)
+        self.rating_cache.clear()
+        self.version += 1
+        self.notify(None)
+
+    def touch(self, names):
+        # bump the version of just these players so their cached ratings are recomputed on next use
+        names = list(names)
+        for name in names:
+            self.player_versions[name] = self.player_versions.get(name, 0) + 1
+        self.version += 1
+        self.notify(names)
+
+    def subscribe(self, callback):
+        # callback(version, names) after every change; names is None when anything may have changed.
+        # Called on the thread that made the change (e.g. a simulation thread for post-match drift).
+        self.subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers: self.subscribers.remove(callback)
+
+    def notify(self, names):
+        for callback in list(self.subscribers): callback(self.version, names)
+
+    def apply_external(self, upserts, deletes):
+        # community changes made by someone else (already on disk): update the table without writing back
+        for name, rec in upserts.items(): self.table.upsert(name, rec, False)
+        for name in deletes:
+            if name in self.official: self.table.upsert(name, self.official[name], True)
+            else: self.table.remove(name)
+        changed = list(upserts) + list(deletes)
+        if changed: self.reindex(changed); self.touch(changed)
+        return changed
+
+    def community_records(self):
+        # plain-dict copy of the community records; a player deleted by another thread meanwhile is skipped
+        out = {}
+        for name in self.names(False):
+            rec = self.community.get(name)
+            if rec is not None: out[name] = rec
+        return out
+
+    def save_community(self):
+        if self.players_file:
+            save_community_players(self.community_records(), self.players_file)
+
+    def persist(self, names):
+        # write back changes to these community players: journal deltas if attached, else a full snapshot
+        if self.journal is None:
+            self.save_community(); return
+        for name in names: self.journal.append(self, name)
+        self.journal.maybe_compact(self)
+
+    def close(self):
+        if self.journal is not None: self.journal.close()
+
+    def set_community_player(self, name, rec):
+        self.table.upsert(name, rec, False)
+        self.reindex([name])
+        self.touch([name])
+        self.persist([name])
+
+    def delete_community_player(self, name):
+        if name not in self.community: return
+        if name in self.official: self.table.upsert(name, self.official[name], True)
+        else: self.table.remove(name)
+        self.reindex([name])
+        self.touch([name])
+        self.persist([name])
+
+    def reindex(self, names):
+        # these players may have switched between official and community (shadowed / un-shadowed)
+        if self.search_index is not None and self.search_index.table is self.table: self.search_index.update(names)
+
+    def row_of(self, name):
+        # table row for a player, or None; subclasses may load the row on demand here
+        return self.table.index.get(name)
+
+    def names(self, official=None):
+        t = self.table
+        if official is None: return list(t.index)
+        return [n for n, i in list(t.index.items()) if bool(t.official[i]) == official]
+
+    def search(self, query, official=None, weight_class=None, specialization=None, limit=SEARCH_LIMIT):
+        # type-ahead matches for `query` (prefix first, then substring; case-insensitive)
+        if self.search_index is None or self.search_index.table is not self.table:
+            self.search_index = NameIndex(self.table)
+        return self.search_index.search(query, official, weight_class, specialization, limit)
+
+    def is_official(self, name):
+        i = self.row_of(name)
+        return i is not None and bool(self.table.official[i])
+
+    def specialization_of(self, name, default="Balanced"):
+        i = self.row_of(name)
+        return default if i is None else self.table.spec_names[self.table.spec[i]]
+
+    def weight_class_of(self, name, default="Middleweight"):
+        i = self.row_of(name)
+        return default if i is None else self.table.wc_names[self.table.wc[i]]
+
+    def rating_entry(self, name, sport_name):
+        # (player version, modified stat tuple, weight-class modifier, weighted stat tuple, solo sport rating)
+        # or None for unknown players; the solo rating is what build_sport_team ranks by
+        key = (name, sport_name)
+        pver = self.player_versions.get(name, 0)
+        entry = self.rating_cache.get(key)
+        if entry is not None and entry[0] == pver:
+            return entry
+        if tracer is not None:
+            tracer.count("ratings_computed")
+            with tracer.span("rating"): return self.compute_rating_entry(name, sport_name, key, pver)
+        return self.compute_rating_entry(name, sport_name, key, pver)
+
+    def compute_rating_entry(self, name, sport_name, key, pver):
+        i = self.row_of(name)
+        if i is None: return None
+        mod_base = apply_specialization_modifier(self, name, dict(zip(STAT_KEYS, self.table.stat_row(i))), sport_name)
+        mod = weight_modifier_for_player(self, name)
+        mod_vec = tuple(mod_base.get(k,0) for k in STAT_KEYS)
+        scaled = tuple(v * mod for v in mod_vec)
+        cfg = sports.get(sport_name)
+        solo = None
+        if cfg is not None:
+            weights = cfg["weights"]
+            if cfg["type"] == "duel":
+                solo = sum(mod_vec[STAT_INDEX[k]] * w for k,w in weights.items()) * mod
+            else:
+                solo = sum(scaled[STAT_INDEX[k]] * w for k,w in weights.items())
+        entry = (pver, mod_vec, mod, scaled, solo)
+        self.rating_cache[key] = entry
+        return entry
+
+    def get(self, name, default=None):
+        return self.merged.get(name, default)
+
+    def __contains__(self, name):
+        return self.row_of(name) is not None
+
+    def __len__(self):
+        return len(self.table.index)
+
+# ---------------------------
+# Players file watcher: picks up community edits made by another process
+# poll() compares (mtime, size) of players.json and its journal. Journal growth is read from the last
+# offset and only records that differ from the table are applied; a rewritten snapshot (or a rotated
+# journal) is diffed against the table as a whole. Changes go through Roster.apply_external(), so
+# subscribers hear about them like any other change and nothing is written back.
+# A compaction by our own journal is not an external change: the watcher waits for it to finish and
+# then just takes over the new signatures, reading the fresh journal from its start.
+# read() only reads and diffs, so it can run on a worker thread (a full resync of a large roster takes
+# as long as loading it) and hand its (upserts, deletes) to the thread that changes the roster.
+# ---------------------------
+def file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+class PlayersFileWatcher:
+    def __init__(self, roster, players_file=None):
+        self.roster = roster
+        self.players_file = players_file or roster.players_file
+        self.journal_path = self.players_file + JOURNAL_SUFFIX
+        self.snapshot_sig = file_signature(self.players_file)
+        self.journal_sig = file_signature(self.journal_path)
+        self.offset = self.journal_sig[1] if self.journal_sig else 0  # the roster was loaded up to here
+        self.tail = b""  # a partly written last line, kept until its newline arrives
+        self.generation = roster.journal.generation if roster.journal is not None else 0
+
+    def differs(self, name, rec):
+        i = self.roster.table.index.get(name)
+        return i is None or self.roster.table.official[i] or self.roster.table.record(i) != rec
+
+    def poll(self):
+        # applies what changed on disk since the last poll; returns the changed names
+        return self.roster.apply_external(*self.read())
+
+    def read(self):
+        # (upserts, deletes) on disk since the last read, not applied yet
+        journal = self.roster.journal
+        if journal is None: return self.read_changes()
+        with journal.lock:
+            if journal.pending: journal._sync()  # our own appends are on disk first
+            if journal.compacting: return {}, []
+            if journal.generation != self.generation:
+                self.generation = journal.generation
+                self.snapshot_sig = file_signature(self.players_file)
+                self.journal_sig = None; self.offset = 0; self.tail = b""
+        upserts, deletes = self.read_changes()
+        # a compaction that started meanwhile may have rotated the files under the read: drop it, the
+        # next poll starts over from the new generation
+        if journal.generation != self.generation: return {}, []
+        return upserts, deletes
+
+    def read_changes(self):
+        snapshot_sig = file_signature(self.players_file); journal_sig = file_signature(self.journal_path)
+        if snapshot_sig == self.snapshot_sig and journal_sig == self.journal_sig: return {}, []
+        size = journal_sig[1] if journal_sig else 0
+        if snapshot_sig != self.snapshot_sig or size < self.offset:
+            changes = self.resync()
+        else:
+            changes = self.read_journal()
+        self.snapshot_sig = snapshot_sig; self.journal_sig = journal_sig
+        return changes
+
+    def read_journal(self):
+        with open(self.journal_path, "rb") as f:
+            f.seek(self.offset); data = self.tail + f.read()
+        self.offset += len(data) - len(self.tail)
+        lines = data.split(b"\n"); self.tail = lines.pop()
+        upserts = {}; deletes = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            name = entry["n"]
+            if entry.get("del"):
+                upserts.pop(name, None)
+                if name in self.roster.community and name not in deletes: deletes.append(name)
+            else:
+                if name in deletes: deletes.remove(name)
+                upserts[name] = journal_line_to_record(entry)
+        upserts = {n: rec for n, rec in upserts.items() if self.differs(n, rec)}
+        return upserts, deletes
+
+    def resync(self):
+        # full diff against snapshot + journals (e.g. another process compacted or rewrote players.json)
+        wanted = load_community_players(self.players_file)
+        upserts = {n: rec for n, rec in wanted.items() if self.differs(n, rec)}
+        deletes = [n for n in self.roster.names(False) if n not in wanted]
+        sig = file_signature(self.journal_path)
+        self.offset = sig[1] if sig else 0; self.tail = b""
+        return upserts, deletes
+
+# ---------------------------
+# Binary roster snapshot: <players file>.snapshot holds the merged table's columns, names and the
+# official records, so startup maps one file instead of parsing JSON and rebuilding every record.
+# It is valid while official_players.json, players.json and the .journal.old file have the recorded
+# mtime/size and the journal still starts with what had been applied (same file, recorded tail
+# bytes); journal lines appended since are replayed on top. verify=True also compares content hashes.
+# Layout: SNAPSHOT_HEADER, JSON meta, then each TABLE_COLUMNS column and the "\n"-joined names.
+# ---------------------------
+SNAPSHOT_SUFFIX = ".snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<4sHHQ")   # magic, version, reserved, meta length
+SNAPSHOT_TAIL = 4096                        # journal bytes before the applied offset that must still match
+
+def file_digest(path):
+    try:
+        with open(path, "rb") as f: return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    except OSError:
+        return None
+
+def journal_tail(path, offset):
+    with open(path, "rb") as f:
+        f.seek(max(0, offset - SNAPSHOT_TAIL)); return hashlib.blake2b(f.read(min(offset, SNAPSHOT_TAIL)), digest_size=16).hexdigest()
+
+def snapshot_sources(official_file, players_file):
+    # what a roster loaded from these files right now is built from (taken before loading: anything
+    # written meanwhile makes the snapshot stale or is replayed from the journal)
+    journal = players_file + JOURNAL_SUFFIX
+    st = os.stat(journal) if os.path.exists(journal) else None
+    return {"official": file_signature(official_file), "players": file_signature(players_file),
+            "journal_old": file_signature(journal + ".old"),
+            "journal": [st.st_ino, st.st_size, journal_tail(journal, st.st_size)] if st else None,
+            "digests": {"official": file_digest(official_file), "players": file_digest(players_file)}}
+
+def write_roster_snapshot(roster, sources):
+    table = roster.table; n = table.n
+    names = [name or "" for name in table.names[:n]]
+    if any("\n" in name for name in names): return False  # not representable; JSON stays the only source
+    meta = {"official": roster.official, "wc_names": table.wc_names, "spec_names": table.spec_names, "n": n,
+            "sources": {k: list(v) if isinstance(v, tuple) else v for k, v in sources.items()}}
+    meta = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+    path = roster.players_file + SNAPSHOT_SUFFIX; tmp = path + ".tmp"
+    try:
+        with trace_span("save_snapshot"), open(tmp, "wb") as f:
+            f.write(SNAPSHOT_HEADER.pack(b"JXSN", SNAPSHOT_VERSION, 0, len(meta))); f.write(meta)
+            for col, width in TABLE_COLUMNS: f.write(getattr(table, col)[:n * width])
+            f.write("\n".join(names).encode("utf-8"))
+            if tracer is not None: tracer.count("bytes_written", f.tell())
+        os.replace(tmp, path)
+    except OSError as e:
+        print("Error saving roster snapshot:", e); return False
+    return True
+
+def load_roster_snapshot(cls, official_file=OFFICIAL_PLAYERS_FILE, players_file=PLAYERS_FILE, verify=False):
+    # a roster from the snapshot, or None when it is missing, unreadable or stale
+    path = players_file + SNAPSHOT_SUFFIX
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)  # private pages: the table may write to them
+    except (OSError, ValueError):
+        return None
+    with trace_span("load_snapshot"):
+        try:
+            magic, version, _, meta_len = SNAPSHOT_HEADER.unpack_from(mm)
+            if magic != b"JXSN" or version != SNAPSHOT_VERSION: return None
+            meta = json.loads(mm[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + meta_len])
+        except (struct.error, ValueError):
+            return None
+        src = meta["sources"]; journal = players_file + JOURNAL_SUFFIX
+        for key, fpath in (("official", official_file), ("players", players_file), ("journal_old", journal + ".old")):
+            sig = file_signature(fpath)
+            if (list(sig) if sig else None) != src[key]: return None
+        offset = 0
+        if src["journal"] is not None:
+            ino, offset, tail = src["journal"]
+            try: st = os.stat(journal)
+            except OSError: return None
+            if st.st_ino != ino or st.st_size < offset or journal_tail(journal, offset) != tail: return None
+        if verify and (file_digest(official_file) != src["digests"]["official"] or file_digest(players_file) != src["digests"]["players"]):
+            return None
+        n = meta["n"]; pos = SNAPSHOT_HEADER.size + meta_len
+        view = memoryview(mm); columns = {}
+        for col, width in TABLE_COLUMNS:
+            columns[col] = view[pos:pos + n * width]; pos += n * width
+        names = str(view[pos:], "utf-8").split("\n") if n else []
+        if len(names) != n: return None
+        if "" in names: names = [name or None for name in names]  # deleted rows
+        table = PlayerTable.attach(names, columns, meta["wc_names"], meta["spec_names"])
+        roster = cls(meta["official"], None, official_file, players_file, table=table)
+        if os.path.exists(journal) and os.path.getsize(journal) > offset:
+            replay_journal_tail(roster, journal, offset)
+    return roster
+
+def replay_journal_tail(roster, journal_path, offset):
+    # journal lines appended after the snapshot was taken, applied straight to the table
+    with open(journal_path, "rb") as f:
+        f.seek(offset); data = f.read()
+    table = roster.table
+    for line in data.split(b"\n"):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue  # torn tail from a crash mid-append
+        name = entry["n"]
+        if entry.get("del"):
+            if name in roster.official: table.upsert(name, roster.official[name], True)
+            else: table.remove(name)
+        else:
+            table.upsert(name, journal_line_to_record(entry), False)
+
+# ---------------------------
+# Transcript events: what happened in a match, as plain JSON-able dicts
+#   match_start {seed}, sports_drawn {sports}, sport_start {sport, icon, mode, side1, side2},
+#   narrative {sport, p1, p2, template}, sport_result {sport, winner (1/2), name (duels)},
+#   score {sport, score}, match_result {winner (0/1/2), score}, drift {player, tiers, specialization}
+# The text transcript is a view over these (render_event), rendered only when it is displayed or
+# exported; sinks and transcript lists receive the events themselves. A narrative event holds the
+# index into sports[sport]["narratives"], not the text.
+# ---------------------------
+def render_event(ev):
+    kind = ev["type"]
+    if kind == "narrative": return render_narrative(ev["sport"], ev["template"], ev["p1"], ev["p2"]) + "\n"
+    if kind == "sport_start":
+        if ev["mode"] == "duel": return f"\n--- {ev['icon']} {ev['sport']}: {ev['side1'][0]} vs {ev['side2'][0]} ---\n"
+        return f"\n--- {ev['icon']} {ev['sport']} ---\n"
+    if kind == "sport_result":
+        return f"{ev['sport']} Winner: {ev['name']}\n" if ev.get("name") else f"{ev['sport']} Winner: Team {ev['winner']}\n"
+    if kind == "score": return f"Score after {ev['sport']}: Team1 {ev['score'][0]} — Team2 {ev['score'][1]}\n\n"
+    if kind == "match_start": return "=== Multisport Match: Best of 5 sports (first to 3) ===\n"
+    if kind == "sports_drawn": return f"Sports in this matchup: {', '.join(ev['sports'])}\n\n"
+    if kind == "match_result":
+        s1, s2 = ev["score"]
+        if ev["winner"] == 1: return f"🏆 MULTISPORT WINNER: Team1 ({s1}-{s2})\n"
+        if ev["winner"] == 2: return f"🏆 MULTISPORT WINNER: Team2 ({s2}-{s1})\n"
+        return "Match ended tied across sports — no clear winner.\n"
+    return ""  # drift and unknown events have no text
+
+def transcript_text(events):
+    return "".join(render_event(ev) for ev in events)
+
+def emit(sink, ev, transcript_list=None):
+    # hands an event to the sink and to the transcript list, if one is kept
+    sink.event(ev)
+    if transcript_list is not None:
+        transcript_list.append(ev)
+
+class TranscriptWriter:
+    # streams events to disk as JSON Lines (gzip-compressed when the path ends in .gz or compress=True);
+    # memory use does not depend on how many events or matches are written
+    def __init__(self, path, compress=None):
+        self.path = path
+        compress = path.endswith(".gz") if compress is None else compress
+        self.f = gzip.open(path, "wt", encoding="utf-8") if compress else open(path, "w", encoding="utf-8")
+        self.count = 0
+    def write(self, ev):
+        line = json.dumps(ev, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self.f.write(line); self.count += 1
+        if tracer is not None: tracer.count("transcript_bytes", len(line))
+    def close(self):
+        if not self.f.closed: self.f.close()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.close()
+
+def read_transcript(path):
+    # yields the events of a .jsonl / .jsonl.gz transcript one at a time
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip(): yield json.loads(line)
+
+# ---------------------------
+# Output sinks: where simulation text, events, progress and pacing go
+# The base sink renders events to text for write(); the null sink discards everything, so headless
+# runs pay nothing for display.
+# ---------------------------
+class OutputSink:
+    narrates = True  # False: simulations skip play-by-play entirely (no events, no draws)
+    def event(self, ev):
+        txt = render_event(ev)
+        if txt: self.write(txt)
+    def write(self, txt): pass
+    def progress(self, percent, label_text=""): pass
+    def pause(self, sec): pass
+    def show_lineups(self, sport_name, side1, side2): pass
+
+class NullSink(OutputSink):
+    narrates = False
+    def event(self, ev): pass
+
+class JsonlSink(OutputSink):
+    # streams every event to a TranscriptWriter as the match runs; `tag` fields (e.g. a fixture id) are
+    # added to each event so many matches can share one file
+    def __init__(self, writer, **tag):
+        self.writer = writer; self.tag = tag
+    def event(self, ev):
+        self.writer.write(dict(ev, **self.tag) if self.tag else ev)
+
+class TeeSink(OutputSink):
+    # forwards everything to several sinks (e.g. the display and a JSONL file)
+    def __init__(self, *sinks):
+        self.sinks = sinks
+        self.narrates = any(s.narrates for s in sinks)
+    def event(self, ev):
+        for s in self.sinks: s.event(ev)
+    def write(self, txt):
+        for s in self.sinks: s.write(txt)
+    def progress(self, percent, label_text=""):
+        for s in self.sinks: s.progress(percent, label_text)
+    def pause(self, sec):
+        for s in self.sinks: s.pause(sec)
+    def show_lineups(self, sport_name, side1, side2):
+        for s in self.sinks: s.show_lineups(sport_name, side1, side2)
+
+class TextSink(OutputSink):
+    # collects output in memory; optionally echoes it to a stream (e.g. sys.stdout)
+    def __init__(self, stream=None):
+        self.lines = []; self.stream = stream
+    def write(self, txt):
+        self.lines.append(txt)
+        if self.stream is not None: self.stream.write(txt)
+    def text(self):
+        return "".join(self.lines)
+
+class EventRecorder(OutputSink):
+    # records the run as an event list instead of pacing it: ("text", txt), ("progress", percent, label),
+    # ("pause", sec), ("lineups", sport_name, side1, side2). The simulation finishes at full speed and the
+    # events can be played back later at any speed (see play_events / the Tk playback scheduler).
+    # The structured transcript events are kept in order in .transcript.
+    def __init__(self):
+        self.events = []; self.transcript = []
+    def event(self, ev):
+        self.transcript.append(ev)
+        OutputSink.event(self, ev)
+    def write(self, txt):
+        self.events.append(("text", txt))
+    def progress(self, percent, label_text=""):
+        self.events.append(("progress", percent, label_text))
+    def pause(self, sec):
+        self.events.append(("pause", sec))
+    def show_lineups(self, sport_name, side1, side2):
+        self.events.append(("lineups", sport_name, list(side1), list(side2)))
+
+def play_events(events, sink, start=0, stop=None):
+    # feeds recorded events [start:stop] to a sink; the sink decides what a pause costs
+    for ev in events[start:stop]:
+        kind = ev[0]
+        if kind == "text": sink.write(ev[1])
+        elif kind == "progress": sink.progress(ev[1], ev[2])
+        elif kind == "pause": sink.pause(ev[1])
+        elif kind == "lineups": sink.show_lineups(ev[1], ev[2], ev[3])
+
+NULL_SINK = NullSink()
+
+# ---------------------------
+# Rating & narrative utilities
+# ---------------------------
+def apply_specialization_modifier(roster, name, base_stats, sport_name):
+    spec = roster.specialization_of(name)  # official + community
+    cfg = SPECIALIZATIONS.get(spec, {})
+    boosts = cfg.get("boost", {})
+    favored = cfg.get("favored_sports", [])
+    mod_stats = base_stats.copy()
+    for k in STAT_KEYS:
+        val = mod_stats.get(k, 0)
+        boost = boosts.get(k, 0)
+        if sport_name in favored:
+            val = int(round(val * (1 + boost)))
+        else:
+            val = int(round(val * (1 + boost * 0.45)))
+        mod_stats[k] = max(1, min(10, val))
+    return mod_stats
+
+def weight_modifier_for_player(roster, name):
+    return WEIGHT_CLASS_MOD.get(roster.weight_class_of(name), 1.0)
+
+def team_rating_by_weights(roster, team_players, weight_map, sport_name):
+    totals = [0] * len(STAT_KEYS)
+    for name in team_players:
+        entry = roster.rating_entry(name, sport_name)
+        if entry is None: continue
+        scaled = entry[3]
+        for i in range(len(STAT_KEYS)):
+            totals[i] += scaled[i]
+    rating = sum(totals[STAT_INDEX[k]] * w for k,w in weight_map.items() if k in STAT_INDEX)
+    return rating
+
+def duel_rating_by_weights(roster, name, weight_map, sport_name):
+    entry = roster.rating_entry(name, sport_name)
+    if entry is None: return 0
+    cfg = sports.get(sport_name)
+    if cfg is not None and cfg["type"] == "duel" and weight_map is cfg["weights"]:
+        return entry[4]
+    mod_vec = entry[1]
+    base_score = sum(mod_vec[STAT_INDEX[k]] * w for k,w in weight_map.items() if k in STAT_INDEX)
+    return base_score * entry[2]
+
+def player_sport_rating(roster, name, sport_name):
+    # cached rating of one player alone in a sport (duel rating, or a one-man team rating)
+    entry = roster.rating_entry(name, sport_name)
+    return entry[4] if entry is not None else 0
+
+# Narrative templates are parsed once per sport into %-format strings (faster to fill than
+# str.format with keywords); replace a sport's "narratives" list (rather than editing it in place)
+# to have it recompiled.
+NARRATIVE_FIELDS = ("p1", "p2")
+compiled_narratives = {}  # sport -> (source list, compiled templates)
+
+def compile_narrative(template):
+    out = []
+    for literal, field, spec, conv in string.Formatter().parse(template):
+        out.append(literal.replace("%", "%%"))
+        if field is None: continue
+        if field not in NARRATIVE_FIELDS or spec or conv:
+            raise ValueError(f"Unsupported narrative field {{{field}}} in {template!r}")
+        out.append(f"%({field})s")
+    return "".join(out)
+
+def narrative_templates(sport_name):
+    templates = sports[sport_name]["narratives"]
+    entry = compiled_narratives.get(sport_name)
+    if entry is None or entry[0] is not templates or len(entry[1]) != len(templates):
+        entry = compiled_narratives[sport_name] = (templates, [compile_narrative(t) for t in templates])
+    return entry[1]
+
+def pick_narrative(sport_name, rng=random):
+    # template index; draws exactly what rng.choice(templates) would
+    return rng.randrange(len(sports[sport_name]["narratives"]))
+
+def render_narrative(sport_name, index, p1, p2):
+    if tracer is not None: tracer.count("narratives")
+    return narrative_templates(sport_name)[index] % {"p1": p1, "p2": p2}
+
+def generate_narrative(sport_name, p1, p2, rng=random):
+    return render_narrative(sport_name, pick_narrative(sport_name, rng), p1, p2)
+
+def synthesize_technique_summary(roster, sport_name, winners, losers):
+    def agg_stats(names):
+        agg = {k:0 for k in STAT_KEYS}
+        for n in names:
+            entry = roster.rating_entry(n, sport_name)
+            if entry is None: continue
+            for k in STAT_KEYS:
+                agg[k] += entry[3][STAT_INDEX[k]]
+        return agg
+    win_stats = agg_stats(winners); lose_stats = agg_stats(losers)
+    diffs = {k: win_stats.get(k,0) - lose_stats.get(k,0) for k in STAT_KEYS}
+    sorted_stats = sorted(diffs.items(), key=lambda x: x[1], reverse=True)
+    top = [s for s,v in sorted_stats if v>0][:3]
+    techniques = []
+    for stat in top:
+        if stat=="power": techniques.append("powerful finishing and heavy shots.")
+        elif stat=="speed": techniques.append("speed & transitions opened space.")
+        elif stat=="stamina": techniques.append("endurance paid off late.")
+        elif stat=="accuracy": techniques.append("precision & placement created chances.")
+        elif stat=="defense": techniques.append("tight defense and effective counters.")
+        elif stat=="clutch": techniques.append("composed clutch plays at key moments.")
+        elif stat=="teamwork": techniques.append("excellent team coordination & build-up.")
+    if not techniques: techniques = ["Balanced skills and tactical execution."]
+    summary = "Techniques & tactics that decided the contest:\n"
+    for i,t in enumerate(techniques, start=1): summary += f"  {i}. {t}\n"
+    return summary
+
+# ---------------------------
+# Tier drift (post-match) - same logic; updates community roster only
+# ---------------------------
+@traced("drift")
+def post_match_tier_drift(roster, winners, losers, sport_name, standout_players=None, rng=random, sink=NULL_SINK):
+    standout_players = set(standout_players or [])
+    table = roster.table
+    touched = []; steps = {}
+    # only update community players; official players remain unchanged
+    for group, is_winner in [(winners, True), (losers, False)]:
+        for name in group:
+            i = roster.row_of(name)
+            if i is None or table.official[i]: continue  # only community players change
+            touched.append(name)
+            k = steps[name] = steps.get(name, -1) + 1   # a player listed twice drifts twice, on separate streams
+            prng = rng.spawn("player", k, name) if isinstance(rng, MatchRNG) else rng  # one stream per drift step
+            base = i * NUM_STATS
+            old_tiers = table.tier_row(i); old_spec = table.spec[i]
+            for s in range(NUM_STATS):
+                current_tier = TIER_ORDER[table.tiers[base+s]]
+                lo, hi = TIER_RANGES.get(current_tier, (1,10))
+                new_val = prng.randint(lo, hi)
+                promote_chance = 0.12 if is_winner else 0.05
+                demote_chance = 0.05 if is_winner else 0.18
+                if name in standout_players:
+                    promote_chance += 0.18; demote_chance -= 0.06
+                new_val = max(1, min(10, new_val))
+                table.stats[base+s] = new_val
+                if prng.random() < promote_chance:
+                    new_t = tier_up(current_tier)
+                    # cap community to B? No — allow community to drift tiers within logic, but your request capped new creations only.
+                    table.tiers[base+s] = tier_index_of(new_t)
+                    table.stats[base+s] = prng.randint(*TIER_RANGES[new_t])
+                elif prng.random() < demote_chance:
+                    new_t = tier_down(current_tier)
+                    table.tiers[base+s] = tier_index_of(new_t)
+                    table.stats[base+s] = prng.randint(*TIER_RANGES[new_t])
+            if prng.random() < 0.06:
+                table.spec[i] = table.spec_code(choose_specialization_from_tiers(table.tiers_map(i)))
+            if sink is not NULL_SINK:
+                tiers = {k: [TIER_ORDER[a], TIER_ORDER[b]] for k, a, b in zip(STAT_KEYS, old_tiers, table.tier_row(i)) if a != b}
+                spec = [table.spec_names[old_spec], table.spec_names[table.spec[i]]] if table.spec[i] != old_spec else None
+                if tiers or spec: sink.event({"type": "drift", "player": name, "tiers": tiers, "specialization": spec})
+    if tracer is not None: tracer.count("drift_rolls", len(touched) * NUM_STATS)
+    # rows are updated in place in the table (no re-merge); only the touched players' cached ratings go stale
+    roster.touch(touched)
+    roster.persist(touched)
+
+# ---------------------------
+# Simulation implementations (concise to fit multisport mode)
+# ---------------------------
+@traced("sport")
+def simulate_single_sport_team(roster, sport_name, team1, team2, transcript=None, sink=NULL_SINK, rng=random, narrate=None):
+    # narrate=None narrates when the sink or a transcript list wants it; the play-by-play only draws
+    # after both ratings are rolled, so skipping it never changes the winner
+    cfg = sports[sport_name]; weight_map = cfg["weights"]
+    emit(sink, {"type": "sport_start", "sport": sport_name, "icon": cfg["icon"], "mode": "team", "side1": list(team1), "side2": list(team2)}, transcript)
+    sink.progress(0, f"Simulating {sport_name}...")
+    sink.pause(0.6)
+    # show avatars and sport icon
+    sink.show_lineups(sport_name, team1, team2)
+    # simulate via rating check with some narrative
+    r1 = team_rating_by_weights(roster, team1, weight_map, sport_name) + rng.uniform(-TEAM_NOISE, TEAM_NOISE)
+    r2 = team_rating_by_weights(roster, team2, weight_map, sport_name) + rng.uniform(-TEAM_NOISE, TEAM_NOISE)
+    # short play-by-play
+    if narrate is None: narrate = sink.narrates or transcript is not None
+    events = rng.randint(3,7) if narrate else 0
+    for i in range(events):
+        p1 = rng.choice(team1); p2 = rng.choice(team2)
+        emit(sink, {"type": "narrative", "sport": sport_name, "p1": p1, "p2": p2, "template": pick_narrative(sport_name, rng)}, transcript)
+        sink.pause(0.25 + rng.random()*0.5)
+        sink.progress(int((i+1)/events*100), f"{sport_name} running...")
+    # decide
+    winner = 1 if r1 > r2 else 2
+    emit(sink, {"type": "sport_result", "sport": sport_name, "winner": winner}, transcript)
+    return winner
+
+@traced("sport")
+def simulate_single_sport_duel(roster, sport_name, p1, p2, transcript=None, sink=NULL_SINK, rng=random, narrate=None):
+    cfg = sports[sport_name]; weight_map = cfg["weights"]
+    emit(sink, {"type": "sport_start", "sport": sport_name, "icon": cfg["icon"], "mode": "duel", "side1": [p1], "side2": [p2]}, transcript)
+    sink.progress(0, f"Simulating {sport_name} duel...")
+    sink.pause(0.6)
+    sink.show_lineups(sport_name, [p1], [p2])
+    r1 = duel_rating_by_weights(roster, p1, weight_map, sport_name) + rng.uniform(-DUEL_NOISE, DUEL_NOISE)
+    r2 = duel_rating_by_weights(roster, p2, weight_map, sport_name) + rng.uniform(-DUEL_NOISE, DUEL_NOISE)
+    # short narrative sequence
+    if narrate is None: narrate = sink.narrates or transcript is not None
+    for _ in range(rng.randint(2,5) if narrate else 0):
+        emit(sink, {"type": "narrative", "sport": sport_name, "p1": p1, "p2": p2, "template": pick_narrative(sport_name, rng)}, transcript)
+        sink.pause(0.3 + rng.random()*0.4)
+    name = p1 if r1 > r2 else p2
+    winner = 1 if name == p1 else 2
+    emit(sink, {"type": "sport_result", "sport": sport_name, "winner": winner, "name": name}, transcript)
+    return winner
+
+# ---------------------------
+# Multisport (Best-of-5) logic
+# - Selects 5 sports randomly from available (ensures diverse set)
+# - Enforces that a single player may play in max 2 different sports during the multisport match
+# - Encourages deeper rosters and collecting
+# ---------------------------
+def build_sport_team(roster, sport_name, team, usage_counts, usage_limit=USAGE_LIMIT):
+    # Build team roster for this sport with strategy: try to avoid players who already hit usage limit
+    cfg = sports[sport_name]
+    # prefer players with usage < limit
+    players_allowed = [p for p in team if usage_counts.get(p,0) < usage_limit]
+    if not players_allowed:
+        # if everybody hit limit, allow everyone (break tie)
+        players_allowed = team[:]
+    size = cfg.get("team_size", 1) if cfg["type"]=="team" else 1
+    # choose a selection: if team has >= size players, pick top rated ones for sport
+    if len(players_allowed) <= size:
+        sel = players_allowed[:]
+    else:
+        # score each by its duel/team rating when alone
+        scored = sorted(players_allowed, key=lambda n: player_sport_rating(roster, n, sport_name), reverse=True)
+        sel = scored[:size]
+    return sel
+
+@traced("lineups")
+def greedy_lineups(roster, sport_names, team1, team2, usage_limit=USAGE_LIMIT):
+    # [(team1 lineup, team2 lineup)] per sport, in play order: each sport takes the best players still under
+    # the usage limit (see juniversus_lineup.plan_lineups for the joint assignment over all sports)
+    usage_counts = dict.fromkeys(team1+team2, 0)
+    lineups = []
+    for sport_name in sport_names:
+        s1 = build_sport_team(roster, sport_name, team1, usage_counts, usage_limit)
+        s2 = build_sport_team(roster, sport_name, team2, usage_counts, usage_limit)
+        for p in s1 + s2: usage_counts[p] = usage_counts.get(p,0) + 1
+        lineups.append((s1, s2))
+    return lineups
+
+def choose_multisport_sports(rng=random):
+    # pick 5 distinct sports (if less than 5 available pick all)
+    all_sports = list(sports.keys())
+    if len(all_sports) >= MULTISPORT_SPORTS:
+        return rng.sample(all_sports, MULTISPORT_SPORTS)
+    return all_sports[:]
+
+def match_drift_rng(seed):
+    return MatchRNG(seed).spawn("drift")
+
+@traced("match")
+def simulate_multisport_match(roster, team1, team2, sink=NULL_SINK, drift=True, seed=None, planner=greedy_lineups, narrate=None):
+    # returns {"seed", "sports", "score", "winner", "standouts", "transcript"}; winner is 1, 2 or 0 for a tie,
+    # transcript the match's events (transcript_text renders them). narrate=False skips the play-by-play
+    # for batch runs; score, winner and drift are the same either way. narrate=None narrates for the
+    # returned transcript unless the caller passed a sink that does not want it (sink.narrates).
+    # The same seed replays the same match; sport draw, each sport and the drift use their own child stream.
+    # drift=False leaves tier drift to the caller (e.g. a league applying results in fixture order),
+    # which should use match_drift_rng(seed) to get the drift the match itself would have rolled.
+    # planner(roster, sports, team1, team2) picks both lineups for every drawn sport up front
+    # (greedy_lineups, or juniversus_lineup.plan_lineups for the optimized assignment).
+    rng = MatchRNG(seed)
+    if narrate is None: narrate = sink is NULL_SINK or sink.narrates
+    transcript = []
+    emit(sink, {"type": "match_start", "seed": rng.root_seed}, transcript)
+    chosen = choose_multisport_sports(rng.spawn("sports"))
+    emit(sink, {"type": "sports_drawn", "sports": chosen}, transcript)
+    # enforce usage limit: players can be used in at most 2 sports
+    usage_counts = dict.fromkeys(team1+team2, 0)  # ordered, so standouts don't depend on string hashing
+    # check before starting: if any player count potential > limit (we don't know per sport selections here),
+    # we'll simply enforce during resolution by skipping a player if they exceeded limit (this encourages smarter selection)
+    score1 = score2 = 0
+    lineups = planner(roster, chosen, team1, team2)
+    for idx, sport_name in enumerate(chosen):
+        cfg = sports[sport_name]
+        sport_rng = rng.spawn("sport", idx)
+        s1, s2 = lineups[idx]
+        # increment usage counts for selected players
+        for p in s1 + s2: usage_counts[p] = usage_counts.get(p,0) + 1
+        # simulate (team or duel)
+        if cfg["type"] == "team":
+            winner = simulate_single_sport_team(roster, sport_name, s1, s2, transcript, sink, sport_rng, narrate)
+            if winner == 1: score1 += 1
+            else: score2 += 1
+        else:
+            # for duel, pick representative players (best ones)
+            sel1 = s1[0] if s1 else sport_rng.choice(team1)
+            sel2 = s2[0] if s2 else sport_rng.choice(team2)
+            winner = simulate_single_sport_duel(roster, sport_name, sel1, sel2, transcript, sink, sport_rng, narrate)
+            if winner == 1: score1 += 1
+            else: score2 += 1
+        emit(sink, {"type": "score", "sport": sport_name, "score": [score1, score2]}, transcript)
+        sink.pause(0.6)
+        # early termination if someone reached 3
+        if score1 >= MULTISPORT_TARGET or score2 >= MULTISPORT_TARGET: break
+    winner = 1 if score1 > score2 else 2 if score2 > score1 else 0
+    emit(sink, {"type": "match_result", "winner": winner, "score": [score1, score2]}, transcript)
+    # post-match drift: pick standout winners (top usage or selects)
+    # determine winners/losers lists (full teams)
+    winners, losers = (team1, team2) if winner == 1 else (team2, team1)
+    standouts = [p for p,c in usage_counts.items() if p in winners and c>0][:2] if winner else []
+    if winner and drift:
+        post_match_tier_drift(roster, winners, losers, "Multisport", standout_players=set(standouts), rng=match_drift_rng(rng.root_seed), sink=sink)
+    return {"seed": rng.root_seed, "sports": chosen, "score": (score1, score2), "winner": winner, "standouts": standouts, "transcript": transcript}
@@ -0,0 +1,244 @@
+# juniversus_history.py
+# JUniversus — per-player rating history (stat, tier and specialization vector after every match)
+# - Append-only and columnar: records are buffered and sealed in chunks; inside a chunk they are
+#   ordered by player, so one player's records are a contiguous run in every column
+# - Each chunk ends with a directory (sorted player ids + run starts), and chunks.bin lists every
+#   chunk with its step range; a trajectory is one binary search and one slice per chunk over the
+#   memory-mapped data file instead of a scan of the season
+# - A chunk's data is flushed before its chunks.bin entry. After a crash the reader skips a partial
+#   entry or a chunk whose data is incomplete, and a reopened writer cuts the partial entry off
+# - HistoryWriter.attach(roster) records the players of every roster change (post-match drift, edits,
+#   external updates); each change is one step
+# - Records are keyed by a player id from meta.json (id -> name, extended as new names appear), not by
+#   roster row: rows are only stable within one process, a reload after a delete shifts them
+# - NumPy is imported where it is used, so importing this module (and the engine) stays cheap
+#
+#   python juniversus_history.py season_history "Alice"
+
+import json, os, struct, sys, threading
+
+from juniversus_engine import STAT_KEYS, TIER_ORDER, NUM_STATS
+
+FORMAT_VERSION = 1
+MAGIC = b"JXHS"
+HEADER = struct.Struct("<4sHHII")   # magic, version, stat count, chunk records, reserved
+CHUNK = struct.Struct("<QIIII")     # data offset, records, players, first step, last step
+DATA_FILE, CHUNKS_FILE, META_FILE = "data.bin", "chunks.bin", "meta.json"
+CHUNK_RECORDS = 1 << 20  # records buffered before a chunk is sealed (~19 MB)
+
+def chunk_layout(n, m):
+    # byte offsets inside a chunk: step u4[n], stats u1[n,7], tiers u1[n,7], spec u1[n], player ids u4[m], starts u4[m+1]
+    steps = 0; stats = steps + 4 * n; tiers = stats + NUM_STATS * n; spec = tiers + NUM_STATS * n
+    players = spec + n; starts = players + 4 * m
+    return steps, stats, tiers, spec, players, starts, starts + 4 * (m + 1)
+
+def open_history_file(path):
+    exists = os.path.exists(path) and os.path.getsize(path) > 0
+    f = open(path, "r+b" if exists else "w+b")
+    if exists:
+        magic, version, n_stats, _, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != FORMAT_VERSION or n_stats != NUM_STATS:
+            f.close(); raise ValueError(f"{path} is not a version {FORMAT_VERSION} history file with these stats")
+        f.seek(0, os.SEEK_END)
+    else:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, NUM_STATS, CHUNK_RECORDS, 0))
+    return f
+
+def read_meta(path):
+    with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+# ---------------------------
+# Writer
+# ---------------------------
+class HistoryWriter:
+    def __init__(self, path, roster, chunk_records=CHUNK_RECORDS):
+        self.path = path; self.roster = roster; self.chunk_records = chunk_records
+        os.makedirs(path, exist_ok=True)
+        meta = read_meta(path) if os.path.exists(os.path.join(path, META_FILE)) else None
+        if meta and meta["stats"] != STAT_KEYS:
+            raise ValueError(f"{path} was written with different stats")
+        self.names = meta["names"] if meta else []       # player id -> name
+        self.ids = {n: i for i, n in enumerate(self.names) if n is not None}
+        self.error = None  # a failure inside a roster notification, raised on the next flush()
+        self.spec_names = meta["specializations"] if meta else list(roster.table.spec_names)
+        self.step = meta["steps"] if meta else 0
+        self.data = open_history_file(os.path.join(path, DATA_FILE))
+        self.chunks = open_history_file(os.path.join(path, CHUNKS_FILE))
+        self.truncate_torn()
+        self.lock = threading.Lock()  # drift may run on simulation threads
+        self.reset_buffer()
+
+    def truncate_torn(self):
+        # drops a partial chunk entry; chunks sealed after the last meta.json still advance the step
+        end = self.chunks.tell(); whole = end - (end - HEADER.size) % CHUNK.size
+        if whole < end: self.chunks.truncate(whole); self.chunks.seek(whole)
+        if whole > HEADER.size:
+            self.chunks.seek(whole - CHUNK.size)
+            self.step = max(self.step, CHUNK.unpack(self.chunks.read(CHUNK.size))[4] + 1)
+
+    def reset_buffer(self):
+        self.b_steps = []; self.b_players = []
+        self.b_stats = bytearray(); self.b_tiers = bytearray(); self.b_spec = bytearray()
+
+    def attach(self):
+        self.roster.subscribe(self.on_change)
+        return self
+
+    def detach(self):
+        self.roster.unsubscribe(self.on_change)
+
+    def on_change(self, version, names):
+        # names is None for bulk refreshes, which change no player values. Runs inside Roster.notify:
+        # an exception here would cut the change short for the other subscribers, so it waits for flush()
+        if not names: return
+        try:
+            self.record(names)
+        except Exception as e:
+            if self.error is None: self.error = e
+
+    def player_id(self, name):
+        pid = self.ids.get(name)
+        if pid is None:
+            pid = self.ids[name] = len(self.names); self.names.append(name)
+        return pid
+
+    def record(self, names):
+        # one step: the current values of these players (deleted players are skipped)
+        table = self.roster.table
+        with self.lock:
+            for name in dict.fromkeys(names):
+                i = self.roster.row_of(name)
+                if i is None: continue
+                spec = table.spec_names[table.spec[i]]
+                if spec not in self.spec_names: self.spec_names.append(spec)
+                self.b_steps.append(self.step); self.b_players.append(self.player_id(name))
+                self.b_stats += table.stats[i*NUM_STATS:(i+1)*NUM_STATS]
+                self.b_tiers += table.tiers[i*NUM_STATS:(i+1)*NUM_STATS]
+                self.b_spec.append(self.spec_names.index(spec))
+            self.step += 1
+            if len(self.b_steps) >= self.chunk_records: self.seal()
+
+    def snapshot(self, official=False):
+        # records every (community by default) player as one step, e.g. before a season starts
+        self.record(self.roster.names(official))
+
+    def seal(self):
+        n = len(self.b_steps)
+        if not n: return
+        import numpy as np
+        players = np.array(self.b_players, dtype=np.uint32)
+        order = np.argsort(players, kind="stable")   # steps stay in order within each player's run
+        players = players[order]
+        uniq, starts = np.unique(players, return_index=True)
+        starts = np.append(starts, n).astype(np.uint32)
+        steps = np.array(self.b_steps, dtype=np.uint32)[order]
+        stats = np.frombuffer(bytes(self.b_stats), dtype=np.uint8).reshape(n, NUM_STATS)[order]
+        tiers = np.frombuffer(bytes(self.b_tiers), dtype=np.uint8).reshape(n, NUM_STATS)[order]
+        spec = np.frombuffer(bytes(self.b_spec), dtype=np.uint8)[order]
+        offset = self.data.tell()
+        for col in (steps.astype("<u4"), stats, tiers, spec, uniq.astype("<u4"), starts.astype("<u4")):
+            self.data.write(col.tobytes())
+        self.data.flush()  # the data is on disk before the entry that points at it
+        self.chunks.write(CHUNK.pack(offset, n, len(uniq), int(steps.min()), int(steps.max())))
+        self.reset_buffer()
+
+    def flush(self):
+        # seals the buffered records and rewrites meta.json; readers opened afterwards see everything
+        with self.lock:
+            self.seal()
+            self.data.flush(); self.chunks.flush()
+            meta = {"format": FORMAT_VERSION, "stats": STAT_KEYS, "tiers": TIER_ORDER, "steps": self.step,
+                    "specializations": self.spec_names, "names": self.names}
+            tmp = os.path.join(self.path, META_FILE + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, os.path.join(self.path, META_FILE))
+        if self.error is not None:
+            e, self.error = self.error, None; raise e
+
+    def close(self):
+        if self.data.closed: return
+        self.detach()
+        try: self.flush()
+        finally: self.data.close(); self.chunks.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ---------------------------
+# Reader
+# ---------------------------
+class HistoryReader:
+    def __init__(self, path):
+        self.path = path
+        meta = read_meta(path)
+        self.names = meta["names"]; self.spec_names = meta["specializations"]; self.steps = meta["steps"]
+        self.ids = {n: i for i, n in enumerate(self.names) if n is not None}
+        # chunks.bin is small (one entry per sealed chunk); the data file is only mapped
+        with open(os.path.join(path, CHUNKS_FILE), "rb") as f:
+            f.seek(HEADER.size); raw = f.read()
+        data_path = os.path.join(path, DATA_FILE); size = os.path.getsize(data_path)
+        chunks = [CHUNK.unpack_from(raw, o) for o in range(0, len(raw) - len(raw) % CHUNK.size, CHUNK.size)]
+        self.chunks = [c for c in chunks if c[0] + chunk_layout(c[1], c[2])[-1] <= size]
+        import numpy as np
+        self.data = np.memmap(data_path, dtype=np.uint8, mode="r") if size > HEADER.size else None
+
+    def close(self):
+        self.data = None  # the map closes once no returned array refers to it
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return sum(c[1] for c in self.chunks)
+
+    def column(self, offset, dtype, count, width=1):
+        import numpy as np
+        col = self.data[offset:offset + count * width * np.dtype(dtype).itemsize].view(dtype)
+        return col.reshape(count, width) if width > 1 else col
+
+    def trajectory(self, name, first_step=0, last_step=None):
+        # {"steps", "stats" (k x 7), "tiers" (k x 7 codes into TIER_ORDER), "spec" (codes into spec_names)}
+        # for every recorded step of `name` in [first_step, last_step], in step order
+        import numpy as np
+        pid = self.ids.get(name)
+        parts = []
+        if pid is not None and self.data is not None:
+            for offset, n, m, lo, hi in self.chunks:
+                if hi < first_step or (last_step is not None and lo > last_step): continue
+                off_steps, off_stats, off_tiers, off_spec, off_players, off_starts, _ = (offset + x for x in chunk_layout(n, m))
+                players = self.column(off_players, "<u4", m)
+                j = int(np.searchsorted(players, pid))
+                if j == m or players[j] != pid: continue
+                starts = self.column(off_starts, "<u4", m + 1)
+                a, b = int(starts[j]), int(starts[j+1])
+                parts.append((self.column(off_steps, "<u4", n)[a:b], self.column(off_stats, np.uint8, n, NUM_STATS)[a:b],
+                              self.column(off_tiers, np.uint8, n, NUM_STATS)[a:b], self.column(off_spec, np.uint8, n)[a:b]))
+        if not parts:
+            return {"steps": np.zeros(0, np.uint32), "stats": np.zeros((0, NUM_STATS), np.uint8),
+                    "tiers": np.zeros((0, NUM_STATS), np.uint8), "spec": np.zeros(0, np.uint8)}
+        steps, stats, tiers, spec = (np.concatenate(cols) for cols in zip(*parts))
+        keep = steps >= first_step
+        if last_step is not None: keep &= steps <= last_step
+        return {"steps": steps[keep], "stats": stats[keep], "tiers": tiers[keep], "spec": spec[keep]}
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("usage: juniversus_history.py HISTORY_DIR PLAYER"); return 2
+    with HistoryReader(argv[0]) as h:
+        t = h.trajectory(argv[1])
+        print(f"{argv[1]}: {len(t['steps'])} of {h.steps} steps")
+        for step, stats, tiers, spec in zip(t["steps"], t["stats"], t["tiers"], t["spec"]):
+            print(f"  {int(step):8d}  " + " ".join(f"{k[:3]} {TIER_ORDER[c]}{v:>2}" for k, c, v in zip(STAT_KEYS, tiers, stats)) + f"  {h.spec_names[spec]}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
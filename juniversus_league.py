@@ -0,0 +1,194 @@
+# juniversus_league.py
+# JUniversus — round-robin leagues and knockout brackets of Multisport matches on a process pool
+# - The roster table is copied once into shared memory; workers attach read-only views to it
+#   (player names are sent once per worker at start-up, never per fixture). Every team member's row
+#   is resolved first (a SqliteRoster loads rows on demand); if the table grows later the pool and
+#   the shared block are rebuilt, since workers only know the rows they started with
+# - Fixtures are played matchday by matchday: every fixture of a round runs concurrently against the
+#   roster as it stood at the start of the round, then tier drift is applied in fixture order and the
+#   shared copy is refreshed before the next round
+# - Every fixture gets its own match seed drawn from the season seed (drift uses that match's drift
+#   stream), so a season replays exactly regardless of worker count or scheduling
+# - batch_drift=True applies a whole round's drift at once (juniversus_drift.season_tier_drift, seeded
+#   from the season seed) and writes the roster back once per round instead of once per fixture
+
+import random, time, os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from juniversus_drift import season_tier_drift
+from juniversus_engine import Roster, PlayerTable, TABLE_COLUMNS, simulate_multisport_match, post_match_tier_drift, match_drift_rng, greedy_lineups, trace_span
+
+# ---------------------------
+# Fixture generation
+# ---------------------------
+def round_robin_rounds(team_names, legs=1):
+    # circle method: every team meets every other once per leg; a None opponent is a bye
+    teams = list(team_names)
+    if len(teams) % 2: teams.append(None)
+    n = len(teams); rounds = []
+    for leg in range(legs):
+        rot = teams[:]
+        for _ in range(n - 1):
+            pairs = []
+            for i in range(n // 2):
+                a, b = rot[i], rot[n-1-i]
+                if a is None or b is None: continue
+                pairs.append((b, a) if leg % 2 else (a, b))  # swap sides on return legs
+            rounds.append(pairs)
+            rot = [rot[0]] + [rot[-1]] + rot[1:-1]
+    return rounds
+
+# ---------------------------
+# Shared-memory roster
+# ---------------------------
+def table_layout(table):
+    # (column, offset, length) of each table column inside the shared block
+    layout = []; off = 0
+    for col, width in TABLE_COLUMNS:
+        layout.append((col, off, table.n * width)); off += table.n * width
+    return layout, off
+
+def table_shape(table):
+    # what workers attached to a shared copy depend on: row count and the code tables
+    return table.n, len(table.wc_names), len(table.spec_names)
+
+def resolve_rows(roster, names):
+    # pulls lazily loaded players (SqliteRoster) into the table before it is shared
+    for name in names: roster.row_of(name)
+
+def publish_table(table, shm, layout):
+    for col, off, length in layout:
+        shm.buf[off:off+length] = getattr(table, col)[:length]
+
+_worker = {}
+
+def _init_worker(shm_name, layout, names, wc_names, spec_names):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    columns = {col: shm.buf[off:off+length] for col, off, length in layout}
+    table = PlayerTable.attach(names, columns, wc_names, spec_names)
+    _worker.update(shm=shm, roster=Roster(table=table, official_file=None, players_file=None), epoch=None)
+
+def _play_fixture(task):
+    fixture_id, epoch, team1, team2, seed, planner = task
+    roster = _worker["roster"]
+    if _worker["epoch"] != epoch:
+        roster.refresh()  # the shared table was updated by last round's drift
+        _worker["epoch"] = epoch
+    return play_fixture(roster, fixture_id, team1, team2, seed, planner)
+
+def play_fixture(roster, fixture_id, team1, team2, seed, planner=greedy_lineups):
+    res = simulate_multisport_match(roster, team1, team2, drift=False, seed=seed, planner=planner, narrate=False)
+    return {"fixture": fixture_id, "seed": seed, "sports": res["sports"], "score": res["score"], "winner": res["winner"], "standouts": res["standouts"]}
+
+# ---------------------------
+# League runner
+# ---------------------------
+class LeagueRunner:
+    def __init__(self, roster, teams, workers=None, seed=0, planner=greedy_lineups, batch_drift=False):
+        # teams: {team name: [player names]}; workers=1 plays in-process (same results, no pool)
+        # planner: module-level lineup function (it is sent to the workers), e.g. juniversus_lineup.plan_lineups
+        self.roster = roster; self.teams = dict(teams); self.planner = planner; self.batch_drift = batch_drift
+        self.workers = workers or os.cpu_count() or 1; self.seed = seed
+        self.rng = random.Random(seed)
+        self.fixture_count = 0
+        self.epoch = 0  # bumped per played round so workers know when to drop cached ratings
+        self.results = []
+        self.pool = None; self.shm = None; self.layout = None; self.shape = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _start_pool(self):
+        if self.workers == 1: return
+        resolve_rows(self.roster, (p for members in self.teams.values() for p in members))
+        table = self.roster.table
+        if self.pool is not None and table_shape(table) == self.shape: return
+        self.close()  # first round, or rows were added since the workers attached
+        self.shape = table_shape(table)
+        self.layout, size = table_layout(table)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+        publish_table(table, self.shm, self.layout)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                        initargs=(self.shm.name, self.layout, table.names, table.wc_names, table.spec_names))
+
+    def close(self):
+        if self.pool is not None: self.pool.shutdown(); self.pool = None
+        if self.shm is not None: self.shm.close(); self.shm.unlink(); self.shm = None
+
+    def play_round(self, round_id, pairs):
+        # plays one matchday concurrently, then applies drift in fixture order; returns results in fixture order
+        self.epoch += 1
+        tasks = []
+        for home, away in pairs:
+            tasks.append((self.fixture_count, self.epoch, self.teams[home], self.teams[away], self.rng.getrandbits(64), self.planner))
+            self.fixture_count += 1
+        if self.workers == 1:
+            outcomes = [play_fixture(self.roster, fid, t1, t2, seed, planner) for fid, _, t1, t2, seed, planner in tasks]
+        else:
+            self._start_pool()
+            outcomes = list(self.pool.map(_play_fixture, tasks, chunksize=max(1, len(tasks) // (4 * self.workers))))
+        decided = []
+        for (home, away), out in zip(pairs, outcomes):
+            out["home"], out["away"] = home, away
+            if out["winner"]:
+                winners, losers = (self.teams[home], self.teams[away]) if out["winner"] == 1 else (self.teams[away], self.teams[home])
+                decided.append((winners, losers, out["standouts"], out["seed"]))
+        if self.batch_drift:
+            season_tier_drift(self.roster, [(w, l, st) for w, l, st, _ in decided], seed=self.rng.getrandbits(64))
+        else:
+            for winners, losers, standouts, seed in decided:
+                # the same drift the match would have rolled itself, applied in fixture order
+                post_match_tier_drift(self.roster, winners, losers, "Multisport", standout_players=set(standouts), rng=match_drift_rng(seed))
+        if self.shm is not None:
+            with trace_span("publish_table"): publish_table(self.roster.table, self.shm, self.layout)
+        for out in outcomes: out["round"] = round_id
+        self.results.extend(outcomes)
+        return outcomes
+
+    def run_round_robin(self, legs=1):
+        start = time.perf_counter(); first = len(self.results)
+        for round_id, pairs in enumerate(round_robin_rounds(self.teams, legs)):
+            self.play_round(round_id, pairs)
+        played = self.results[first:]
+        elapsed = time.perf_counter() - start
+        return {"standings": standings(played, self.teams), "fixtures": played,
+                "elapsed": elapsed, "fixtures_per_sec": len(played) / elapsed if elapsed else 0.0}
+
+    def run_knockout(self, seeding=None):
+        # single elimination in seeding order (1 v last, 2 v second-last, ...); top seeds get byes
+        # when the field is not a power of two; a tied series goes to the higher seed
+        start = time.perf_counter(); first = len(self.results)
+        alive = list(seeding or self.teams)
+        size = 1
+        while size < len(alive): size *= 2
+        byes = size - len(alive)
+        bracket_rounds = []; round_id = 0
+        advancing = alive[:byes]; field = alive[byes:]
+        while len(field) + len(advancing) > 1:
+            pairs = [(field[i], field[len(field)-1-i]) for i in range(len(field) // 2)]
+            outcomes = self.play_round(round_id, pairs)
+            bracket_rounds.append(outcomes)
+            winners = [o["away"] if o["winner"] == 2 else o["home"] for o in outcomes]
+            field = advancing + winners; advancing = []
+            round_id += 1
+        played = self.results[first:]
+        elapsed = time.perf_counter() - start
+        return {"champion": (field + advancing)[0] if (field + advancing) else None, "rounds": bracket_rounds,
+                "fixtures": played, "elapsed": elapsed, "fixtures_per_sec": len(played) / elapsed if elapsed else 0.0}
+
+def standings(results, teams):
+    # 3 points for a series win, 1 for a tie; ordered by points, sport difference, sports won, name
+    table = {t: {"team": t, "played": 0, "won": 0, "tied": 0, "lost": 0, "sports_for": 0, "sports_against": 0, "points": 0} for t in teams}
+    for r in results:
+        s_home, s_away = r["score"]
+        for team, sf, sa, res in ((r["home"], s_home, s_away, 1), (r["away"], s_away, s_home, 2)):
+            row = table[team]
+            row["played"] += 1; row["sports_for"] += sf; row["sports_against"] += sa
+            if r["winner"] == 0: row["tied"] += 1; row["points"] += 1
+            elif r["winner"] == res: row["won"] += 1; row["points"] += 3
+            else: row["lost"] += 1
+    return sorted(table.values(), key=lambda row: (-row["points"], -(row["sports_for"] - row["sports_against"]), -row["sports_for"], row["team"]))
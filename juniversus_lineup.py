@@ -0,0 +1,148 @@
+# juniversus_lineup.py
+# JUniversus — Multisport lineup optimizer (all chosen sports assigned together under the usage limit)
+# - A team sport's rating is the sum of its players' solo ratings (player_sport_rating), so for fixed
+#   per-sport weights the best lineup is a min-cost flow: source -> player (capacity usage_limit)
+#   -> sport (capacity 1 per player) -> sink (capacity = lineup size)
+# - The series win probability is not linear in the ratings: each pass weights every sport by how much
+#   one rating point there moves P(win series) against the opponent's lineups, re-solves the flow, and
+#   the best lineup by exact series probability is kept (the greedy lineup is the starting point)
+# - Only the top (total lineup slots) players of each sport can appear in an optimal lineup, so the flow
+#   graph stays tiny however large the team is
+
+import heapq
+
+from juniversus_engine import sports, USAGE_LIMIT, greedy_lineups, player_sport_rating, traced
+from juniversus_odds import noise_width, prob_from_gap
+
+PASSES = 4  # reweight / re-solve rounds after the greedy start
+
+def lineup_size(sport_name, team):
+    cfg = sports[sport_name]
+    size = cfg.get("team_size", 1) if cfg["type"] == "team" else 1
+    return min(size, len(team))
+
+def win_count_distribution(probs):
+    # dist[w] = P(exactly w sports won) for independent sports
+    dist = [1.0]
+    for p in probs:
+        nxt = [0.0] * (len(dist) + 1)
+        for w, q in enumerate(dist):
+            nxt[w] += q * (1 - p); nxt[w+1] += q * p
+        dist = nxt
+    return dist
+
+def series_value(probs):
+    # P(win the series) + half of P(tie); who wins a first-to-3 series does not depend on the order the
+    # sports are played in, or on the early stop, so this is just more sports won than lost
+    k = len(probs)
+    return sum(q * (1.0 if 2*w > k else 0.5 if 2*w == k else 0.0) for w, q in enumerate(win_count_distribution(probs)))
+
+def series_gradient(probs):
+    # d series_value / d probs[s]: value with sport s won minus value with it lost
+    grads = []
+    for s in range(len(probs)):
+        rest = probs[:s] + probs[s+1:]
+        grads.append(series_value(rest + [1.0]) - series_value(rest + [0.0]))
+    return grads
+
+def gap_density(gap, width):
+    # derivative of prob_from_gap: the triangular density of the noise difference
+    span = 2.0 * width
+    return max(0.0, span - abs(gap)) / (span * span)
+
+def min_cost_assignment(candidates, slots, usage_limit):
+    # candidates: per sport a list of (player, value); slots: per sport lineup size.
+    # Maximizes the total value of a lineup with every player in at most usage_limit sports (and at most
+    # once per sport); successive shortest paths (Bellman-Ford) on the residual graph, one unit at a time.
+    players = list(dict.fromkeys(p for cand in candidates for p, _ in cand))
+    k = len(slots); pidx = {p: 1 + i for i, p in enumerate(players)}
+    src = 0; sink = 1 + len(players) + k; n = sink + 1
+    graph = [[] for _ in range(n)]  # edge: [to, capacity, cost, index of reverse edge]
+    def add(u, v, cap, cost):
+        graph[u].append([v, cap, cost, len(graph[v])]); graph[v].append([u, 0, -cost, len(graph[u]) - 1])
+    for p in players: add(src, pidx[p], usage_limit, 0.0)
+    for s, cand in enumerate(candidates):
+        for p, value in cand: add(pidx[p], 1 + len(players) + s, 1, -value)
+        add(1 + len(players) + s, sink, slots[s], 0.0)
+    for _ in range(sum(slots)):
+        dist = [float("inf")] * n; prev = [None] * n; dist[src] = 0.0
+        for _ in range(n):
+            changed = False
+            for u in range(n):
+                if dist[u] == float("inf"): continue
+                for ei, (v, cap, cost, _) in enumerate(graph[u]):
+                    if cap > 0 and dist[u] + cost < dist[v] - 1e-12:
+                        dist[v] = dist[u] + cost; prev[v] = (u, ei); changed = True
+            if not changed: break
+        if prev[sink] is None: break  # no more room under the usage limit
+        v = sink
+        while v != src:
+            u, ei = prev[v]; e = graph[u][ei]
+            e[1] -= 1; graph[v][e[3]][1] += 1; v = u
+    lineups = []
+    for s in range(k):
+        node = 1 + len(players) + s
+        # a saturated player -> sport edge shows up as capacity on its reverse edge
+        lineups.append([players[v - 1] for v, cap, _, _ in graph[node] if 1 <= v <= len(players) and cap > 0])
+    return lineups
+
+def fill_lineups(roster, sport_names, team, lineups):
+    # when the usage limit leaves a sport short (small teams), reuse the best players, like greedy does
+    for sport_name, sel in zip(sport_names, lineups):
+        need = lineup_size(sport_name, team) - len(sel)
+        if need > 0:
+            rest = [p for p in team if p not in sel]
+            sel += sorted(rest, key=lambda n: player_sport_rating(roster, n, sport_name), reverse=True)[:need]
+        sel.sort(key=lambda n: player_sport_rating(roster, n, sport_name), reverse=True)  # duels field sel[0]
+    return lineups
+
+def lineup_rating(roster, sport_name, sel):
+    return sum(player_sport_rating(roster, p, sport_name) for p in sel)
+
+def sport_probs(roster, sport_names, lineups, opponent):
+    return [prob_from_gap(lineup_rating(roster, s, a) - lineup_rating(roster, s, b), noise_width(s))
+            for s, a, b in zip(sport_names, lineups, opponent)]
+
+def optimize_lineups(roster, sport_names, team, opponent_lineups, usage_limit=USAGE_LIMIT, start=None, passes=PASSES):
+    # best lineups for `team` in every sport of sport_names against fixed opponent lineups;
+    # returns (lineups, series value)
+    sport_names = list(sport_names); team = list(dict.fromkeys(team))
+    slots = [lineup_size(s, team) for s in sport_names]
+    total = sum(slots)
+    # top `total` players per sport are the only ones an optimal lineup can use
+    ratings = [{p: player_sport_rating(roster, p, s) for p in team} for s in sport_names]
+    tops = [heapq.nlargest(total, team, key=r.get) for r in ratings]
+    best = [list(sel) for sel in start] if start is not None else None
+    best_val = series_value(sport_probs(roster, sport_names, best, opponent_lineups)) if best is not None else -1.0
+    current = best
+    for _ in range(passes):
+        if current is None:
+            weights = [1.0] * len(sport_names)
+        else:
+            probs = sport_probs(roster, sport_names, current, opponent_lineups)
+            grads = series_gradient(probs)
+            weights = []
+            for s, sel, opp, g in zip(sport_names, current, opponent_lineups, grads):
+                gap = lineup_rating(roster, s, sel) - lineup_rating(roster, s, opp)
+                weights.append(g * gap_density(gap, noise_width(s)))
+            # decided sports (or a decided series) still prefer stronger lineups, just with the least weight
+            floor = max(weights) * 1e-3 if max(weights) > 0 else 1.0
+            weights = [max(w, floor) for w in weights]
+        candidates = [[(p, w * ratings[s][p]) for p in tops[s]] for s, w in enumerate(weights)]
+        lineups = fill_lineups(roster, sport_names, team, min_cost_assignment(candidates, slots, usage_limit))
+        val = series_value(sport_probs(roster, sport_names, lineups, opponent_lineups))
+        if lineups == current: break
+        current = lineups
+        if val > best_val + 1e-12: best, best_val = lineups, val
+    return best, best_val
+
+@traced("lineups")
+def plan_lineups(roster, sport_names, team1, team2, usage_limit=USAGE_LIMIT):
+    # lineups for both teams in every chosen sport: each team optimizes against the other's greedy
+    # lineups (neither side sees the other's plan), starting from its own greedy lineups.
+    # Same shape as greedy_lineups, so it can be passed to simulate_multisport_match as planner.
+    greedy = greedy_lineups(roster, sport_names, team1, team2, usage_limit)
+    g1 = [s1 for s1, _ in greedy]; g2 = [s2 for _, s2 in greedy]
+    l1, _ = optimize_lineups(roster, sport_names, team1, g2, usage_limit, start=g1)
+    l2, _ = optimize_lineups(roster, sport_names, team2, g1, usage_limit, start=g2)
+    return list(zip(l1, l2))
@@ -0,0 +1,150 @@
+# juniversus_matchmaking.py
+# JUniversus — rating-indexed matchmaking
+# - RatingIndex keeps one sport's players sorted by effective solo rating (player_sport_rating, the
+#   value build_sport_team ranks by); the k closest-rated opponents are a bisect plus a walk outwards
+# - A team's rating is the sum of its players' solo ratings, so a balanced split is a partition
+#   problem on those numbers: exact for small groups, greedy + swap refinement beyond that
+# - Matchmaker subscribes to the roster and re-rates only the players a change touched (post-match
+#   drift, edits, external updates); a bulk refresh marks the indexes stale and they rebuild on next use
+
+import bisect, itertools, math, threading
+
+from juniversus_engine import sports, player_sport_rating
+
+EXACT_SPLITS = 200000  # candidate splits tried exhaustively before falling back to the heuristic
+SWAP_PASSES = 50
+
+class RatingIndex:
+    def __init__(self, roster, sport_name, official=None):
+        # official: None indexes everyone, False only community players, True only official ones
+        if sport_name not in sports: raise KeyError(f"Unknown sport: {sport_name}")
+        self.roster = roster; self.sport_name = sport_name; self.official = official
+        self.entries = []   # sorted [(rating, name)]
+        self.ratings = {}   # name -> rating in entries
+        self.build()
+
+    def build(self):
+        self.ratings = {n: player_sport_rating(self.roster, n, self.sport_name) for n in self.roster.names(self.official)}
+        self.entries = sorted((r, n) for n, r in self.ratings.items())
+
+    def __len__(self):
+        return len(self.entries)
+
+    def update(self, names):
+        # re-rates these players (drops deleted ones, adds new ones that pass the filter)
+        for name in names:
+            old = self.ratings.pop(name, None)
+            if old is not None:
+                del self.entries[bisect.bisect_left(self.entries, (old, name))]
+            i = self.roster.row_of(name)
+            if i is None or (self.official is not None and bool(self.roster.table.official[i]) != self.official): continue
+            r = player_sport_rating(self.roster, name, self.sport_name)
+            self.ratings[name] = r
+            bisect.insort(self.entries, (r, name))
+
+    def rating(self, name):
+        r = self.ratings.get(name)
+        return player_sport_rating(self.roster, name, self.sport_name) if r is None else r
+
+    def closest(self, target, k=10, exclude=()):
+        # up to k (name, rating) closest to `target` (a player name or a rating), nearest first
+        if isinstance(target, str):
+            exclude = set(exclude) | {target}; target = self.rating(target)
+        else:
+            exclude = set(exclude)
+        entries = self.entries; out = []
+        hi = bisect.bisect_left(entries, (target,)); lo = hi - 1
+        while len(out) < k and (lo >= 0 or hi < len(entries)):
+            if hi >= len(entries) or (lo >= 0 and target - entries[lo][0] <= entries[hi][0] - target):
+                r, n = entries[lo]; lo -= 1
+            else:
+                r, n = entries[hi]; hi += 1
+            if n not in exclude: out.append((n, r))
+        return out
+
+    def between(self, low, high):
+        # (name, rating) with low <= rating <= high, ascending
+        a = bisect.bisect_left(self.entries, (low,)); b = bisect.bisect_right(self.entries, (high, chr(0x10ffff)))
+        return [(n, r) for r, n in self.entries[a:b]]
+
+def balanced_split(ratings, size=None):
+    # ratings: {name: rating}; returns (side1, side2, gap) with len(side1) == size (half by default)
+    # minimizing |sum(side1) - sum(side2)|; both sides sorted strongest first
+    names = sorted(ratings, key=lambda n: (-ratings[n], n))
+    n = len(names); size = n // 2 if size is None else size
+    if not 0 <= size <= n: raise ValueError(f"Cannot take {size} of {n} players")
+    total = sum(ratings.values())
+    best = None
+    if math.comb(n, size) <= EXACT_SPLITS:
+        # with an even split, fixing the strongest player on side1 halves the work
+        fixed = names[:1] if 2 * size == n and n else []
+        rest = names[len(fixed):]
+        for combo in itertools.combinations(rest, size - len(fixed)):
+            s = sum(ratings[p] for p in fixed) + sum(ratings[p] for p in combo)
+            gap = abs(2 * s - total)
+            if best is None or gap < best[0]: best = (gap, fixed + list(combo))
+        side1 = set(best[1])
+    else:
+        side1 = greedy_split(names, ratings, size, total)
+    s1 = [p for p in names if p in side1]; s2 = [p for p in names if p not in side1]
+    return s1, s2, abs(sum(ratings[p] for p in s1) - sum(ratings[p] for p in s2))
+
+def greedy_split(names, ratings, size, total):
+    # strongest first onto the weaker side that still has room, then the best single swaps
+    side1, side2 = [], []; sum1 = sum2 = 0.0
+    for p in names:
+        if len(side1) < size and (sum1 <= sum2 or len(side2) >= len(names) - size):
+            side1.append(p); sum1 += ratings[p]
+        else:
+            side2.append(p); sum2 += ratings[p]
+    for _ in range(SWAP_PASSES):
+        diff = sum1 - sum2
+        # swapping a (side1) with b (side2) changes diff by 2 * (rb - ra); aim for ra - rb = diff / 2
+        pool = sorted((ratings[b], b) for b in side2)
+        best = (abs(diff), None, None)
+        for a in side1:
+            want = ratings[a] - diff / 2
+            j = bisect.bisect_left(pool, (want,))
+            for rb, b in pool[max(0, j-1):j+1]:
+                gap = abs(diff - 2 * (ratings[a] - rb))
+                if gap < best[0] - 1e-12: best = (gap, a, b)
+        if best[1] is None: break
+        _, a, b = best
+        side1.remove(a); side2.remove(b); side1.append(b); side2.append(a)
+        sum1 += ratings[b] - ratings[a]; sum2 += ratings[a] - ratings[b]
+    return set(side1)
+
+class Matchmaker:
+    # one RatingIndex per sport, built on first use and kept current from roster change notifications
+    def __init__(self, roster, official=None):
+        self.roster = roster; self.official = official
+        self.indexes = {}; self.stale = set()
+        self.lock = threading.Lock()  # drift notifications may arrive on simulation threads
+        roster.subscribe(self.on_change)
+
+    def close(self):
+        self.roster.unsubscribe(self.on_change)
+
+    def on_change(self, version, names):
+        with self.lock:
+            if names is None: self.stale.update(self.indexes)
+            else:
+                for idx in self.indexes.values(): idx.update(names)
+
+    def index(self, sport_name):
+        with self.lock:
+            idx = self.indexes.get(sport_name)
+            if idx is None: idx = self.indexes[sport_name] = RatingIndex(self.roster, sport_name, self.official)
+            elif sport_name in self.stale: idx.build()
+            self.stale.discard(sport_name)
+            return idx
+
+    def closest_opponents(self, name, sport_name, k=10, exclude=()):
+        idx = self.index(sport_name)
+        with self.lock: return idx.closest(name, k, exclude)
+
+    def balanced_split(self, players, sport_name, size=None):
+        # e.g. a 5v5 Basketball split of 10 players: (side1, side2, rating gap)
+        idx = self.index(sport_name)
+        with self.lock: ratings = {p: idx.rating(p) for p in dict.fromkeys(players)}
+        return balanced_split(ratings, size)
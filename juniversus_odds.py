@@ -0,0 +1,62 @@
+# juniversus_odds.py
+# JUniversus — exact single-sport win probabilities
+# A single sport is decided by r1 + U1 > r2 + U2 with U1, U2 ~ Uniform(-w, w) independent
+# (w = TEAM_NOISE for team sports, DUEL_NOISE for duels). U2 - U1 has a triangular density
+# on [-2w, 2w], so P(side1 wins) = P(U2 - U1 < r1 - r2) has a closed form in the rating gap.
+
+from juniversus_engine import sports, TEAM_NOISE, DUEL_NOISE, team_rating_by_weights, duel_rating_by_weights, numpy_module
+
+def noise_width(sport_name):
+    return TEAM_NOISE if sports[sport_name]["type"] == "team" else DUEL_NOISE
+
+def prob_from_gap(gap, width):
+    # CDF of the triangular difference of two Uniform(-width, width) at `gap`
+    span = 2.0 * width
+    if gap <= -span: return 0.0
+    if gap >= span: return 1.0
+    if gap <= 0:
+        return (gap + span) ** 2 / (2.0 * span * span)
+    return 1.0 - (span - gap) ** 2 / (2.0 * span * span)
+
+def side_rating(roster, sport_name, side):
+    # side is a list of names for team sports, a single name (or 1-item list) for duels
+    cfg = sports[sport_name]
+    if cfg["type"] == "team":
+        return team_rating_by_weights(roster, list(side), cfg["weights"], sport_name)
+    name = side if isinstance(side, str) else side[0]
+    return duel_rating_by_weights(roster, name, cfg["weights"], sport_name)
+
+def win_probability(roster, sport_name, side1, side2):
+    gap = side_rating(roster, sport_name, side1) - side_rating(roster, sport_name, side2)
+    return prob_from_gap(gap, noise_width(sport_name))
+
+def prob_matrix_from_ratings(ratings1, ratings2, width):
+    # element [i][j] = P(side i of ratings1 beats side j of ratings2); nested lists without NumPy
+    np = numpy_module()
+    if np is None:
+        return [[prob_from_gap(a - b, width) for b in ratings2] for a in ratings1]
+    gap = np.asarray(ratings1, dtype=np.float64)[:, None] - np.asarray(ratings2, dtype=np.float64)[None, :]
+    span = 2.0 * width
+    g = np.clip(gap, -span, span)
+    low = (g + span) ** 2 / (2.0 * span * span)
+    high = 1.0 - (span - g) ** 2 / (2.0 * span * span)
+    return np.where(g <= 0, low, high)
+
+def win_probability_matrix(roster, sport_name, sides1, sides2):
+    # rates every side once, then scores all len(sides1) x len(sides2) pairings in one shot
+    ratings1 = [side_rating(roster, sport_name, s) for s in sides1]
+    ratings2 = [side_rating(roster, sport_name, s) for s in sides2]
+    return prob_matrix_from_ratings(ratings1, ratings2, noise_width(sport_name))
+
+def win_probabilities(roster, sport_name, pairs):
+    # P(side1 beats side2) for each (side1, side2) in pairs; a side appearing in several pairs is rated once
+    ratings = {}
+    def rating(side):
+        key = side if isinstance(side, str) else tuple(side)
+        if key not in ratings: ratings[key] = side_rating(roster, sport_name, side)
+        return ratings[key]
+    gaps = [rating(s1) - rating(s2) for s1, s2 in pairs]
+    width = noise_width(sport_name)
+    if numpy_module() is None:
+        return [prob_from_gap(g, width) for g in gaps]
+    return prob_matrix_from_ratings(gaps, [0.0], width)[:, 0].tolist()
@@ -0,0 +1,322 @@
+# juniversus_replay.py
+# JUniversus — compact binary match-replay files for season analytics
+# - A replay is a directory: matches.bin (one fixed-width record per Multisport match), drift.bin (one
+#   fixed-width record per drifted player) and meta.json (sport, specialization and player names)
+# - Match record: seed, drawn sports, both lineups of every sport as player ids, per-sport winners,
+#   final score; drift record: match number, player id, tier deltas, specialization change. Player
+#   ids index meta.json's names (extended as new names appear), so they survive roster reloads
+# - ReplayWriter is an output sink: tee it next to the display (or use it alone) and every match is
+#   recorded from its transcript events, no text is parsed
+# - A match's drift records are written before its match record, which commits them: after a crash
+#   the reader ignores a partial last record and drift records no match claims, and a reopened
+#   writer cuts both files back to the last complete match before appending
+# - ReplayReader memory-maps the files: records decode on demand, and columns() / drift_columns()
+#   are zero-copy NumPy views, so season queries are array operations over the mapped pages
+#
+#   python juniversus_replay.py season_replay --player "Alice" --sport Tennis
+
+import json, mmap, os, struct, sys
+
+from juniversus_engine import sports, STAT_KEYS, SPECIALIZATIONS, TIER_ORDER, MULTISPORT_SPORTS, NUM_STATS, OutputSink, numpy_module
+
+# NumPy is loaded on first use (numpy_module); records still iterate without it, only the column views need it
+
+FORMAT_VERSION = 1
+MAGIC = b"JXRP"
+HEADER = struct.Struct("<4sHHII")   # magic, version, kind, record size, reserved
+KIND_MATCH, KIND_DRIFT = 0, 1
+MATCHES_FILE, DRIFT_FILE, META_FILE = "matches.bin", "drift.bin", "meta.json"
+
+MAX_SPORTS = MULTISPORT_SPORTS
+MAX_SIDE = max(cfg.get("team_size", 1) if cfg["type"] == "team" else 1 for cfg in sports.values())
+NO_SPORT = 0xFF
+NO_PLAYER = 0xFFFFFFFF
+SPEC_SAME = 0xFF
+
+# seed, sports[5] (drawn, in order; NO_SPORT padding), winners[5] (0 = not played), score[2], winner
+# (0 tie), sports played (a decided series stops early), drift records,
+# lineups[5][2][MAX_SIDE] (NO_PLAYER padding)
+MATCH_RECORD = struct.Struct(f"<Q{MAX_SPORTS}B{MAX_SPORTS}B2BBBH{MAX_SPORTS * 2 * MAX_SIDE}I")
+# match number, player id, tier deltas[7] (new - old tier code), old specialization, new specialization
+DRIFT_RECORD = struct.Struct(f"<II{NUM_STATS}bBB")
+DRIFT_COUNT_AT = struct.calcsize(f"<Q{MAX_SPORTS}B{MAX_SPORTS}B2BBB")  # byte offset of the drift count in a match record
+
+def match_dtype():
+    np = numpy_module()
+    return np.dtype([("seed", "<u8"), ("sports", "u1", (MAX_SPORTS,)), ("winners", "u1", (MAX_SPORTS,)),
+                     ("score", "u1", (2,)), ("winner", "u1"), ("played", "u1"), ("drift_count", "<u2"),
+                     ("lineups", "<u4", (MAX_SPORTS, 2, MAX_SIDE))])
+
+def drift_dtype():
+    np = numpy_module()
+    return np.dtype([("match", "<u4"), ("player", "<u4"), ("tiers", "i1", (NUM_STATS,)),
+                     ("spec_old", "u1"), ("spec_new", "u1")])
+
+def open_records(path, kind, size):
+    # opens (or creates) a record file for appending and checks its header
+    exists = os.path.exists(path) and os.path.getsize(path) > 0
+    f = open(path, "r+b" if exists else "w+b")
+    if exists:
+        magic, version, k, rsize, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or k != kind or rsize != size or version != FORMAT_VERSION:
+            f.close(); raise ValueError(f"{path} is not a version {FORMAT_VERSION} replay file of this layout")
+        f.seek(0, os.SEEK_END)
+    else:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, kind, size, 0))
+    return f
+
+def record_count(path, size):
+    return max(0, os.path.getsize(path) - HEADER.size) // size
+
+def drift_total(buf, n):
+    # drift records claimed by the first n match records of buf (matches.bin, read or mapped)
+    if not n: return 0
+    np = numpy_module()
+    if np is not None: return int(np.frombuffer(buf, dtype=match_dtype(), count=n, offset=HEADER.size)["drift_count"].sum())
+    return sum(struct.unpack_from("<H", buf, HEADER.size + i * MATCH_RECORD.size + DRIFT_COUNT_AT)[0] for i in range(n))
+
+# ---------------------------
+# Writer
+# ---------------------------
+class ReplayWriter(OutputSink):
+    narrates = False  # nothing of the play-by-play is stored; matches recorded through this sink alone skip it
+    # appends every Multisport match played through it to the replay directory `path`.
+    # A match is complete once its drift has been applied, so each record is written when the next match
+    # starts, on flush() or on close().
+    def __init__(self, path, roster):
+        self.path = path; self.roster = roster
+        os.makedirs(path, exist_ok=True)
+        meta = read_meta(path) if os.path.exists(os.path.join(path, META_FILE)) else None
+        self.sport_names = meta["sports"] if meta else list(sports)
+        self.spec_names = meta["specializations"] if meta else list(SPECIALIZATIONS)
+        self.names = meta["names"] if meta else []   # player id -> name
+        self.ids = {n: i for i, n in enumerate(self.names) if n is not None}
+        if meta and meta["stats"] != STAT_KEYS:
+            raise ValueError(f"{path} was written with different stats")
+        self.sport_codes = {s: i for i, s in enumerate(self.sport_names)}
+        self.spec_codes = {s: i for i, s in enumerate(self.spec_names)}
+        self.matches = open_records(os.path.join(path, MATCHES_FILE), KIND_MATCH, MATCH_RECORD.size)
+        self.drift = open_records(os.path.join(path, DRIFT_FILE), KIND_DRIFT, DRIFT_RECORD.size)
+        self.count = record_count(os.path.join(path, MATCHES_FILE), MATCH_RECORD.size)
+        self.truncate_torn()
+        self.current = None
+
+    def truncate_torn(self):
+        # drops a partial match record and drift records written for a match whose record never was
+        end = HEADER.size + self.count * MATCH_RECORD.size
+        if self.count:
+            with mmap.mmap(self.matches.fileno(), 0, access=mmap.ACCESS_READ) as mm: claimed = drift_total(mm, self.count)
+        else:
+            claimed = 0
+        for f, size in ((self.matches, end), (self.drift, HEADER.size + claimed * DRIFT_RECORD.size)):
+            if f.seek(0, os.SEEK_END) > size: f.truncate(size); f.seek(size)
+
+    def player_id(self, name):
+        pid = self.ids.get(name)
+        if pid is None:
+            pid = self.ids[name] = len(self.names); self.names.append(name)
+        return pid
+
+    def sport_code(self, sport):
+        code = self.sport_codes.get(sport)
+        if code is None: code = self.sport_codes[sport] = len(self.sport_names); self.sport_names.append(sport)
+        return code
+
+    def spec_code(self, spec):
+        code = self.spec_codes.get(spec)
+        if code is None: code = self.spec_codes[spec] = len(self.spec_names); self.spec_names.append(spec)
+        return code
+
+    def event(self, ev):
+        kind = ev["type"]; cur = self.current
+        if kind == "match_start":
+            self.finish()
+            if not 0 <= ev["seed"] < 1 << 64: raise ValueError("replay files store 64-bit match seeds")
+            self.current = {"seed": ev["seed"], "sports": [], "winners": [], "lineups": [], "score": (0, 0), "winner": 0, "drift": []}
+        elif cur is None:
+            return  # single-sport runs have no match record
+        elif kind == "sports_drawn":
+            cur["sports"] = [self.sport_code(sp) for sp in ev["sports"]][:MAX_SPORTS]
+        elif kind == "sport_start":
+            cur["lineups"].append(([self.player_id(p) for p in ev["side1"]], [self.player_id(p) for p in ev["side2"]]))
+        elif kind == "sport_result":
+            cur["winners"].append(ev["winner"])
+        elif kind == "match_result":
+            cur["score"] = tuple(ev["score"]); cur["winner"] = ev["winner"]
+        elif kind == "drift":
+            deltas = [0] * NUM_STATS
+            for k, (old, new) in ev["tiers"].items():
+                deltas[STAT_KEYS.index(k)] = TIER_ORDER.index(new) - TIER_ORDER.index(old)
+            spec = ev["specialization"]
+            cur["drift"].append((self.player_id(ev["player"]), deltas, self.spec_code(spec[0]) if spec else SPEC_SAME, self.spec_code(spec[1]) if spec else SPEC_SAME))
+
+    def finish(self):
+        cur = self.current
+        if cur is None: return
+        self.current = None
+        played = len(cur["lineups"])
+        sports_col = cur["sports"] + [NO_SPORT] * (MAX_SPORTS - len(cur["sports"]))
+        winners = cur["winners"] + [0] * (MAX_SPORTS - len(cur["winners"]))
+        lineups = []
+        for s in range(MAX_SPORTS):
+            for side in (cur["lineups"][s] if s < played else ((), ())):
+                lineups += list(side[:MAX_SIDE]) + [NO_PLAYER] * (MAX_SIDE - len(side))
+        for player, deltas, old, new in cur["drift"]:
+            self.drift.write(DRIFT_RECORD.pack(self.count, player, *deltas, old, new))
+        self.drift.flush()  # on disk before the match record that claims it
+        self.matches.write(MATCH_RECORD.pack(cur["seed"], *sports_col, *winners, *cur["score"], cur["winner"], played, len(cur["drift"]), *lineups))
+        self.count += 1
+
+    def flush(self):
+        # writes the pending match and the names seen so far; the files are then readable as they stand
+        self.finish()
+        self.matches.flush(); self.drift.flush()
+        meta = {"format": FORMAT_VERSION, "sports": self.sport_names, "stats": STAT_KEYS, "tiers": TIER_ORDER,
+                "specializations": self.spec_names, "names": self.names}
+        tmp = os.path.join(self.path, META_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, os.path.join(self.path, META_FILE))
+
+    def close(self):
+        if self.matches.closed: return
+        self.flush()
+        self.matches.close(); self.drift.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_meta(path):
+    with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+# ---------------------------
+# Reader
+# ---------------------------
+def map_records(path, kind, size):
+    # (mmap or None, record count); an empty file cannot be mapped
+    with open(path, "rb") as f:
+        magic, version, k, rsize, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or k != kind or rsize != size or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} replay file of this layout")
+        n = record_count(path, size)
+        return (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if n else None), n
+
+class ReplayReader:
+    def __init__(self, path):
+        self.path = path
+        meta = read_meta(path)
+        self.sport_names = meta["sports"]; self.spec_names = meta["specializations"]; self.names = meta["names"]
+        self.ids = {n: i for i, n in enumerate(self.names) if n is not None}
+        self.mm, self.n = map_records(os.path.join(path, MATCHES_FILE), KIND_MATCH, MATCH_RECORD.size)
+        self.drift_mm, self.drift_n = map_records(os.path.join(path, DRIFT_FILE), KIND_DRIFT, DRIFT_RECORD.size)
+        self.drift_n = min(self.drift_n, drift_total(self.mm, self.n))  # unclaimed records are from an unfinished match
+        self.drift_offsets = None
+
+    def close(self):
+        # column arrays from columns() must be dropped first; they point into the maps
+        for mm in (self.mm, self.drift_mm):
+            if mm is not None: mm.close()
+        self.mm = self.drift_mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.n
+
+    def name(self, pid):
+        return self.names[pid] if pid < len(self.names) else None
+
+    def decode(self, i, drift_start):
+        vals = MATCH_RECORD.unpack_from(self.mm, HEADER.size + i * MATCH_RECORD.size)
+        seed = vals[0]; k = MAX_SPORTS
+        sport_codes = vals[1:1+k]; winners = vals[1+k:1+2*k]
+        score = vals[1+2*k:3+2*k]; winner, played, n_drift = vals[3+2*k:6+2*k]
+        flat = vals[6+2*k:]
+        lineups = []
+        for s in range(played):
+            sides = []
+            for side in range(2):
+                base = (s * 2 + side) * MAX_SIDE
+                sides.append([self.name(r) for r in flat[base:base+MAX_SIDE] if r != NO_PLAYER])
+            lineups.append(tuple(sides))
+        drift = []
+        for j in range(drift_start, drift_start + n_drift):
+            rec = DRIFT_RECORD.unpack_from(self.drift_mm, HEADER.size + j * DRIFT_RECORD.size)
+            deltas = rec[2:2+NUM_STATS]; old, new = rec[2+NUM_STATS:]
+            drift.append({"player": self.name(rec[1]), "tiers": {k: d for k, d in zip(STAT_KEYS, deltas) if d},
+                          "specialization": [self.spec_names[old], self.spec_names[new]] if old != SPEC_SAME else None})
+        return {"match": i, "seed": seed, "sports": [self.sport_names[c] for c in sport_codes if c != NO_SPORT], "played": played,
+                "winners": list(winners[:played]), "lineups": lineups, "score": tuple(score), "winner": winner,
+                "drift": drift}, n_drift
+
+    def __iter__(self):
+        drift_start = 0
+        for i in range(self.n):
+            rec, n_drift = self.decode(i, drift_start)
+            drift_start += n_drift
+            yield rec
+
+    def __getitem__(self, i):
+        if not -self.n <= i < self.n: raise IndexError(i)
+        i %= self.n
+        if self.drift_offsets is None:
+            # drift records are in match order; where each match's records start
+            counts = [MATCH_RECORD.unpack_from(self.mm, HEADER.size + j * MATCH_RECORD.size)[3+2*MAX_SPORTS+2] for j in range(self.n)]
+            self.drift_offsets = [0] * self.n
+            for j in range(1, self.n): self.drift_offsets[j] = self.drift_offsets[j-1] + counts[j-1]
+        return self.decode(i, self.drift_offsets[i])[0]
+
+    # ---- zero-copy NumPy views ----
+    def columns(self):
+        # structured array over the mapped match records (fields as in match_dtype)
+        np = numpy_module()
+        if self.mm is None: return np.zeros(0, dtype=match_dtype())
+        return np.frombuffer(self.mm, dtype=match_dtype(), count=self.n, offset=HEADER.size)
+
+    def drift_columns(self):
+        np = numpy_module()
+        if self.drift_mm is None: return np.zeros(0, dtype=drift_dtype())
+        return np.frombuffer(self.drift_mm, dtype=drift_dtype(), count=self.drift_n, offset=HEADER.size)
+
+    def player_record(self, name, sport=None):
+        # {"played", "won", "win_rate"}: sports (optionally only `sport`) `name` was in the lineup for
+        pid = self.ids.get(name)
+        if pid is None: return {"played": 0, "won": 0, "win_rate": 0.0}
+        cols = self.columns()
+        on_side = (cols["lineups"] == pid).any(axis=3)           # (matches, sports, 2)
+        if sport is not None:
+            if sport not in self.sport_names: raise KeyError(sport)
+            on_side &= (cols["sports"] == self.sport_names.index(sport))[:, :, None]
+        winners = cols["winners"]
+        played = int(on_side.sum())
+        won = int((on_side[:, :, 0] & (winners == 1)).sum() + (on_side[:, :, 1] & (winners == 2)).sum())
+        return {"played": played, "won": won, "win_rate": won / played if played else 0.0}
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Summarize a JUniversus replay directory")
+    ap.add_argument("path")
+    ap.add_argument("--player", help="win record of this player")
+    ap.add_argument("--sport", help="only this sport (with --player)")
+    args = ap.parse_args(argv)
+    with ReplayReader(args.path) as r:
+        cols = r.columns()
+        print(f"{len(r)} matches, {r.drift_n} drift records, {sum(n is not None for n in r.names)} players")
+        if len(r):
+            print(f"Team1 {int((cols['winner'] == 1).sum())} / Team2 {int((cols['winner'] == 2).sum())} / tied {int((cols['winner'] == 0).sum())}")
+        if args.player:
+            rec = r.player_record(args.player, args.sport)
+            print(f"{args.player}{' in ' + args.sport if args.sport else ''}: {rec['won']}/{rec['played']} ({rec['win_rate']:.1%})")
+        del cols
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,459 @@
+# juniversus_service.py
+# JUniversus — local HTTP/JSON simulation service (asyncio, standard library only)
+# - GET  /health, /players?q=&limit=, /players/<name>
+#   POST /odds       {"sport", "side1", "side2"}                      -> {"p1"}
+#   POST /match      {"sport", "side1", "side2", "seed"?, "transcript"?} -> single-sport result (+ events and text)
+#   POST /multisport {"team1", "team2", "seed"?, "drift"?, "planner"?}   -> Multisport result
+# - Concurrent requests are micro-batched: odds requests arriving within BATCH_WINDOW are rated in one
+#   call per sport (every distinct side rated once), simulations are sent to the worker pool in chunks
+# - The event loop never touches the roster: lookups, odds and drift run on one roster thread, so
+#   every roster write (post-match drift, journaled) goes through a single writer in arrival order
+# - Simulations run on a process pool over a shared-memory copy of the table (as in juniversus_league).
+#   Two copies alternate: drift is published into the copy no running simulation uses, then new
+#   simulations switch to it. Every player is loaded into the table before the copies are made; if
+#   the table still grows, the pool and both copies are rebuilt once running simulations finish
+#
+#   python juniversus_service.py serve --port 8765
+#   python juniversus_service.py loadtest --port 8765 --requests 5000 --concurrency 64
+
+import argparse, asyncio, json, os, random, sys, time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from juniversus_engine import (
+    sports, Roster, PlayerTable, MatchRNG, EventRecorder, SEARCH_LIMIT, greedy_lineups, post_match_tier_drift,
+    match_drift_rng, simulate_single_sport_team, simulate_single_sport_duel, transcript_text, traced,
+)
+from juniversus_league import table_layout, table_shape, resolve_rows, publish_table, play_fixture
+from juniversus_lineup import plan_lineups
+from juniversus_odds import win_probabilities
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+BATCH_WINDOW = 0.002     # seconds a request waits for others to share its batch
+MAX_BATCH = 256
+MAX_BODY = 1 << 20
+MAX_SEARCH_LIMIT = 1000
+PLANNERS = {"greedy": greedy_lineups, "optimal": plan_lineups}
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message); self.status = status
+    def __reduce__(self):  # travels back from pool workers
+        return (RequestError, (self.status, str(self)))
+
+# ---------------------------
+# Simulation jobs (run in pool workers, or on the roster thread without a pool)
+# ---------------------------
+def run_job(roster, job):
+    kind = job[0]
+    if kind == "multisport":
+        _, team1, team2, seed, planner = job
+        return play_fixture(roster, None, team1, team2, seed, PLANNERS[planner])
+    _, sport_name, side1, side2, seed, transcript = job
+    rec = EventRecorder() if transcript else None
+    kwargs = {"rng": MatchRNG(seed)}
+    if rec is not None: kwargs["sink"] = rec
+    if sports[sport_name]["type"] == "team":
+        winner = simulate_single_sport_team(roster, sport_name, side1, side2, **kwargs)
+    else:
+        winner = simulate_single_sport_duel(roster, sport_name, side1[0], side2[0], **kwargs)
+    out = {"sport": sport_name, "seed": seed, "winner": winner}
+    if rec is not None: out["transcript"] = rec.transcript; out["text"] = transcript_text(rec.transcript)
+    return out
+
+@traced("service_jobs")
+def run_jobs(roster, jobs):
+    out = []
+    for job in jobs:
+        try: out.append(run_job(roster, job))
+        except (KeyError, ValueError, IndexError) as e: out.append(RequestError(400, f"Simulation failed: {e}"))
+    return out
+
+_worker = {}
+
+def _init_worker(shm_names, layout, names, wc_names, spec_names):
+    # one Roster per shared copy; epochs tell each one when its copy was republished
+    shms = [shared_memory.SharedMemory(name=n) for n in shm_names]
+    rosters = []
+    for shm in shms:
+        columns = {col: shm.buf[off:off+length] for col, off, length in layout}
+        rosters.append(Roster(table=PlayerTable.attach(names, columns, wc_names, spec_names), official_file=None, players_file=None))
+    _worker.update(shms=shms, rosters=rosters, epochs=[None] * len(shms))
+
+def _run_jobs(buffer, epoch, jobs):
+    roster = _worker["rosters"][buffer]
+    if _worker["epochs"][buffer] != epoch:
+        roster.refresh(); _worker["epochs"][buffer] = epoch
+    return run_jobs(roster, jobs)
+
+# ---------------------------
+# Micro-batching
+# ---------------------------
+class MicroBatcher:
+    # collects items submitted within `window` seconds (or until max_batch) and hands them to
+    # run_batch(items) -> awaitable list of results (an exception instance fails just that item)
+    def __init__(self, run_batch, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.run_batch = run_batch; self.window = window; self.max_batch = max_batch
+        self.pending = []; self.timer = None
+
+    async def submit(self, item):
+        fut = asyncio.get_running_loop().create_future()
+        self.pending.append((item, fut))
+        if len(self.pending) >= self.max_batch: self.flush()
+        elif self.timer is None: self.timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+        return await fut
+
+    def flush(self):
+        if self.timer is not None: self.timer.cancel(); self.timer = None
+        batch, self.pending = self.pending, []
+        if batch: asyncio.ensure_future(self.run(batch))
+
+    async def run(self, batch):
+        try:
+            results = await self.run_batch([item for item, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, fut), res in zip(batch, results):
+            if fut.done(): continue
+            if isinstance(res, BaseException): fut.set_exception(res)
+            else: fut.set_result(res)
+
+# ---------------------------
+# Service
+# ---------------------------
+class SimulationService:
+    def __init__(self, roster, workers=None, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        # workers=0 runs simulations on the roster thread (no process pool)
+        self.roster = roster
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.roster_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="roster")
+        self.odds_batcher = MicroBatcher(self.odds_batch, window, max_batch)
+        self.sim_batcher = MicroBatcher(self.sim_batch, window, max_batch)
+        self.drift_queue = None; self.writer_task = None
+        self.pool = None; self.shms = []; self.layout = None; self.shape = None
+        self.table_shape = None  # the table's shape as last seen on the roster thread
+        self.publishing = None  # asyncio.Lock: rebuilding the copies vs publishing drift into them
+        self.epoch = 0; self.inflight = [0, 0]; self.idle = None
+        self.server = None
+        self.requests = 0
+
+    # ---- lifecycle ----
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.drift_queue = asyncio.Queue(); self.idle = asyncio.Condition(); self.publishing = asyncio.Lock()
+        if self.workers > 0:
+            await self.on_roster(lambda: resolve_rows(self.roster, self.roster.names()))
+            await self.rebuild_pool()
+        self.writer_task = asyncio.ensure_future(self.drift_writer())
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server is not None: self.server.close(); await self.server.wait_closed(); self.server = None
+        if self.writer_task is not None:
+            await self.drift_queue.join()
+            self.writer_task.cancel(); self.writer_task = None
+        self.stop_pool()
+        await self.on_roster(self.roster.close)
+        self.roster_thread.shutdown()
+
+    def stop_pool(self):
+        if self.pool is not None: self.pool.shutdown(); self.pool = None
+        for shm in self.shms: shm.close(); shm.unlink()
+        self.shms = []
+
+    def make_copies(self):
+        # roster thread: both shared copies of the table as it is now
+        table = self.roster.table
+        self.shape = self.table_shape = table_shape(table)
+        self.layout, size = table_layout(table)
+        self.shms = [shared_memory.SharedMemory(create=True, size=max(1, size)) for _ in range(2)]
+        for shm in self.shms: publish_table(table, shm, self.layout)
+        return [s.name for s in self.shms], self.layout, list(table.names), list(table.wc_names), list(table.spec_names)
+
+    def stale_pool(self, shape):
+        return self.pool is None or shape != self.shape
+
+    async def rebuild_pool(self):
+        # (re)starts the pool when the table has rows or codes the workers' copies lack
+        async with self.publishing:
+            if not self.stale_pool(self.table_shape): return
+            if self.pool is not None:
+                async with self.idle: await self.idle.wait_for(lambda: self.inflight == [0, 0])
+                self.stop_pool()
+            initargs = await self.on_roster(self.make_copies)
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=initargs)
+
+    async def on_roster(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.roster_thread, fn, *args)
+
+    # ---- batches ----
+    async def odds_batch(self, items):
+        return await self.on_roster(odds_for, self.roster, items)
+
+    async def sim_batch(self, jobs):
+        if self.workers == 0:
+            return await self.on_roster(run_jobs, self.roster, jobs)
+        # requests were validated on the roster thread, which records the shape any lookup left behind
+        while self.stale_pool(self.table_shape):
+            await self.rebuild_pool()
+        buffer = self.epoch % 2; epoch = self.epoch
+        self.inflight[buffer] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            size = -(-len(jobs) // self.workers)
+            chunks = [jobs[i:i+size] for i in range(0, len(jobs), size)]
+            parts = await asyncio.gather(*(loop.run_in_executor(self.pool, _run_jobs, buffer, epoch, c) for c in chunks))
+            return [res for part in parts for res in part]
+        finally:
+            self.inflight[buffer] -= 1
+            async with self.idle: self.idle.notify_all()
+
+    async def drift_writer(self):
+        # the only writer: applies queued drift in arrival order, then republishes the shared table once
+        while True:
+            items = [await self.drift_queue.get()]
+            while not self.drift_queue.empty(): items.append(self.drift_queue.get_nowait())
+            try:
+                await self.on_roster(apply_drifts, self.roster, [item[:4] for item in items])
+                if self.workers > 0:
+                    async with self.publishing:
+                        buffer = (self.epoch + 1) % 2
+                        async with self.idle: await self.idle.wait_for(lambda: self.inflight[buffer] == 0)
+                        await self.on_roster(publish_table, self.roster.table, self.shms[buffer], self.layout)
+                        self.epoch += 1
+                else:
+                    self.epoch += 1
+                for item in items: item[4].set_result(None)
+            except Exception as e:
+                for item in items:
+                    if not item[4].done(): item[4].set_exception(e)
+            finally:
+                for _ in items: self.drift_queue.task_done()
+
+    # ---- endpoints ----
+    def check_players(self, names):
+        # roster thread: a lazily loaded roster may add rows here, so the table's shape is noted after
+        for n in names:
+            if not isinstance(n, str) or self.roster.row_of(n) is None:
+                raise RequestError(400, f"Unknown player: {n}")
+        self.table_shape = table_shape(self.roster.table)
+
+    async def sport_sides(self, body):
+        sport_name = body.get("sport")
+        if sport_name not in sports: raise RequestError(400, f"Unknown sport: {sport_name}")
+        sides = []
+        for key in ("side1", "side2"):
+            side = player_list(body, key)
+            if not side: raise RequestError(400, f"{key} is empty")
+            sides.append(side if sports[sport_name]["type"] == "team" else side[:1])
+        await self.on_roster(self.check_players, sides[0] + sides[1])
+        return sport_name, sides[0], sides[1]
+
+    async def get_players(self, query):
+        q = query.get("q", [""])[0]
+        try: limit = max(1, min(MAX_SEARCH_LIMIT, int(query.get("limit", [SEARCH_LIMIT])[0])))
+        except ValueError: raise RequestError(400, "limit must be an integer")
+        return {"players": await self.on_roster(self.roster.search, q, None, None, None, limit)}
+
+    async def get_player(self, name):
+        rec = await self.on_roster(self.roster.get, name)
+        if rec is None: raise RequestError(404, f"Unknown player: {name}")
+        return dict(rec, name=name)
+
+    async def post_odds(self, body):
+        sport_name, side1, side2 = await self.sport_sides(body)
+        return {"sport": sport_name, "p1": await self.odds_batcher.submit((sport_name, side1, side2))}
+
+    async def post_match(self, body):
+        sport_name, side1, side2 = await self.sport_sides(body)
+        seed = request_seed(body)
+        return await self.sim_batcher.submit(("match", sport_name, side1, side2, seed, bool(body.get("transcript"))))
+
+    async def post_multisport(self, body):
+        team1 = player_list(body, "team1"); team2 = player_list(body, "team2")
+        if not team1 or not team2: raise RequestError(400, "team1 and team2 are required")
+        await self.on_roster(self.check_players, team1 + team2)
+        planner = body.get("planner", "greedy")
+        if planner not in PLANNERS: raise RequestError(400, f"Unknown planner: {planner}")
+        seed = request_seed(body)
+        res = await self.sim_batcher.submit(("multisport", team1, team2, seed, planner))
+        res.pop("fixture", None)
+        if res["winner"] and body.get("drift", True):
+            # the drift the match would have rolled itself, written by the single drift writer
+            winners, losers = (team1, team2) if res["winner"] == 1 else (team2, team1)
+            done = asyncio.get_running_loop().create_future()
+            self.drift_queue.put_nowait((winners, losers, res["standouts"], seed, done))
+            await done
+            res["drift"] = True
+        return res
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target); path = url.path.rstrip("/") or "/"
+        if path == "/health" and method == "GET":
+            return {"status": "ok", "players": await self.on_roster(len, self.roster), "epoch": self.epoch, "requests": self.requests}
+        if path == "/players" and method == "GET":
+            return await self.get_players(parse_qs(url.query))
+        if path.startswith("/players/") and method == "GET":
+            return await self.get_player(unquote(path[len("/players/"):]))
+        routes = {"/odds": self.post_odds, "/match": self.post_match, "/multisport": self.post_multisport}
+        if path in routes:
+            if method != "POST": raise RequestError(405, f"{path} expects POST")
+            try: payload = json.loads(body or b"{}")
+            except ValueError: raise RequestError(400, "Body is not valid JSON")
+            if not isinstance(payload, dict): raise RequestError(400, "Body must be a JSON object")
+            return await routes[path](payload)
+        raise RequestError(404, f"No route for {method} {path}")
+
+    async def handle(self, reader, writer):
+        # HTTP/1.1 with keep-alive; one request at a time per connection
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                except ValueError:
+                    await respond(writer, 400, {"error": "Malformed request line"}, False); break
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""): break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                try: length = int(headers.get("content-length", 0))
+                except ValueError: length = -1
+                if not 0 <= length <= MAX_BODY:
+                    await respond(writer, 413 if length > MAX_BODY else 400, {"error": "Bad Content-Length"}, False); break
+                body = await reader.readexactly(length) if length else b""
+                self.requests += 1
+                try:
+                    status, payload = 200, await self.dispatch(method, target, body)
+                except RequestError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                await respond(writer, status, payload, keep)
+                if not keep: break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+def player_list(body, key):
+    # a player name or a list of names
+    value = body.get(key)
+    if value is None: return []
+    if isinstance(value, str): return [value]
+    if isinstance(value, list): return value
+    raise RequestError(400, f"{key} must be a player name or a list of names")
+
+def request_seed(body):
+    seed = body.get("seed")
+    if seed is None: return random.getrandbits(64)
+    if not isinstance(seed, int) or seed < 0: raise RequestError(400, "seed must be a non-negative integer")
+    return seed
+
+@traced("service_odds")
+def odds_for(roster, items):
+    # items: (sport, side1, side2); one win_probabilities call per sport
+    out = [None] * len(items); by_sport = {}
+    for k, (sport_name, s1, s2) in enumerate(items): by_sport.setdefault(sport_name, []).append((k, s1, s2))
+    for sport_name, group in by_sport.items():
+        probs = win_probabilities(roster, sport_name, [(s1 if len(s1) > 1 else s1[0], s2 if len(s2) > 1 else s2[0]) for _, s1, s2 in group])
+        for (k, _, _), p in zip(group, probs): out[k] = p
+    return out
+
+def apply_drifts(roster, items):
+    for winners, losers, standouts, seed in items:
+        post_match_tier_drift(roster, winners, losers, "Multisport", standout_players=set(standouts), rng=match_drift_rng(seed))
+
+async def respond(writer, status, payload, keep):
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    writer.write((f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep else 'close'}\r\n\r\n").encode("latin-1") + data)
+    await writer.drain()
+
+# ---------------------------
+# Load test client
+# ---------------------------
+async def http_request(reader, writer, method, path, payload=None):
+    data = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode("latin-1") + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1]); length = 0
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""): break
+        k, _, v = h.decode("latin-1").partition(":")
+        if k.strip().lower() == "content-length": length = int(v)
+    return status, json.loads(await reader.readexactly(length))
+
+async def load_test(host=DEFAULT_HOST, port=DEFAULT_PORT, requests=2000, concurrency=32, mix=("odds", "match", "multisport"), seed=0):
+    # keep-alive clients firing a mix of requests at random players; returns throughput and latency percentiles
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    _, found = await http_request(reader, writer, "GET", f"/players?limit={MAX_SEARCH_LIMIT}")
+    writer.close()
+    names = found["players"]
+    side = min(10, len(names) // 2)  # up to 10 a side, fewer on a small roster (the default has 11)
+    if side < 1: raise ValueError("the roster needs at least 2 players for a load test")
+    team_sports = [s for s, c in sports.items() if c["type"] == "team"]; duel_sports = [s for s, c in sports.items() if c["type"] == "duel"]
+    latencies = []; statuses = {}; todo = [requests]
+    def next_request():
+        kind = rng.choice(mix); players = rng.sample(names, 2 * side)
+        if kind == "multisport": return "/multisport", {"team1": players[:side], "team2": players[side:], "seed": rng.getrandbits(63)}
+        sport_name = rng.choice(team_sports + duel_sports)
+        size = min(side, sports[sport_name].get("team_size", 1)) if sport_name in team_sports else 1
+        return f"/{kind}", {"sport": sport_name, "side1": players[:size], "side2": players[side:side+size], "seed": rng.getrandbits(63)}
+    async def client():
+        r, w = await asyncio.open_connection(host, port)
+        try:
+            while todo[0] > 0:
+                todo[0] -= 1
+                path, body = next_request()
+                start = time.perf_counter()
+                status, _ = await http_request(r, w, "POST", path, body)
+                latencies.append(time.perf_counter() - start); statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            w.close()
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    pct = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+    return {"requests": len(latencies), "seconds": elapsed, "requests_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+            "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99), "statuses": statuses}
+
+async def serve(roster, host, port, workers):
+    service = SimulationService(roster, workers)
+    server = await service.start(host, port)
+    print(f"JUniversus service on http://{host}:{port} ({len(roster)} players, {service.workers} workers)")
+    try:
+        async with server: await server.serve_forever()
+    finally:
+        await service.close()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="JUniversus local simulation service")
+    sub = ap.add_subparsers(dest="command", required=True)
+    s = sub.add_parser("serve"); s.add_argument("--host", default=DEFAULT_HOST); s.add_argument("--port", type=int, default=DEFAULT_PORT)
+    s.add_argument("--workers", type=int, default=None, help="simulation processes (0: simulate on the roster thread)")
+    l = sub.add_parser("loadtest"); l.add_argument("--host", default=DEFAULT_HOST); l.add_argument("--port", type=int, default=DEFAULT_PORT)
+    l.add_argument("--requests", type=int, default=2000); l.add_argument("--concurrency", type=int, default=32)
+    l.add_argument("--mix", default="odds,match,multisport", help="comma-separated endpoints to exercise")
+    args = ap.parse_args(argv)
+    if args.command == "serve":
+        try: asyncio.run(serve(Roster.from_files(journaled=True), args.host, args.port, args.workers))
+        except KeyboardInterrupt: pass
+        return 0
+    res = asyncio.run(load_test(args.host, args.port, args.requests, args.concurrency, tuple(args.mix.split(","))))
+    print(f"{res['requests']} requests in {res['seconds']:.2f}s: {res['requests_per_sec']:,.0f} req/s, "
+          f"p50 {res['p50_ms']:.1f} ms, p95 {res['p95_ms']:.1f} ms, p99 {res['p99_ms']:.1f} ms, statuses {res['statuses']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
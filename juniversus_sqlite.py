@@ -0,0 +1,229 @@
+# juniversus_sqlite.py
+# JUniversus — SQLite roster store (alternative to official_players.json + players.json)
+# - One `players` table holding official and community rows (a community row shadows an official one
+#   with the same name, like the merged roster always did); indexed by name, weight class,
+#   specialization, official flag and every per-stat tier
+# - SqliteRoster opens with only the (small) official roster in memory and loads community players
+#   on first use, so startup does not depend on community roster size
+# - persist() writes every player touched by an add/delete/drift in one transaction
+# - The JSON files stay the import/export format (import_json / export_json)
+
+import sqlite3, threading, sys
+
+from juniversus_engine import (
+    OFFICIAL_PLAYERS_FILE, PLAYERS_FILE, STAT_KEYS, TIER_ORDER, SEARCH_LIMIT, Roster,
+    tier_index_of, load_official_players, load_community_players, save_official_players, save_community_players,
+)
+
+ROSTER_DB_FILE = "roster.db"
+
+STAT_COLS = ", ".join(STAT_KEYS)
+TIER_COLS = ", ".join("tier_" + k for k in STAT_KEYS)
+PLAYER_COLS = f"name, official, weight_class, specialization, {STAT_COLS}, {TIER_COLS}"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS players (
+    name TEXT NOT NULL,
+    official INTEGER NOT NULL,
+    weight_class TEXT NOT NULL,
+    specialization TEXT NOT NULL,
+    {", ".join(k + " INTEGER NOT NULL" for k in STAT_KEYS)},
+    {", ".join("tier_" + k + " INTEGER NOT NULL" for k in STAT_KEYS)},
+    PRIMARY KEY (name, official)
+);
+CREATE INDEX IF NOT EXISTS idx_players_weight_class ON players(weight_class);
+CREATE INDEX IF NOT EXISTS idx_players_specialization ON players(specialization);
+CREATE INDEX IF NOT EXISTS idx_players_official ON players(official);
+""" + "".join(f"CREATE INDEX IF NOT EXISTS idx_players_tier_{k} ON players(tier_{k});\n" for k in STAT_KEYS)
+# name lookups use the (name, official) primary key index
+
+# the row a name resolves to: community rows, and official rows no community row shadows
+EFFECTIVE = "(official=0 OR NOT EXISTS (SELECT 1 FROM players c WHERE c.name=players.name AND c.official=0))"
+
+def record_to_row(name, rec, official):
+    tiers = rec.get("tiers", {}); stats = rec.get("stats", {})
+    return ((name, 1 if official else 0, rec.get("weight_class", "Middleweight"), rec.get("specialization", "Balanced"))
+            + tuple(int(stats.get(k, 0)) for k in STAT_KEYS)
+            + tuple(tier_index_of(tiers.get(k, "B")) for k in STAT_KEYS))
+
+def row_to_record(row):
+    n = len(STAT_KEYS)
+    stats = row[4:4+n]; tiers = row[4+n:4+2*n]
+    return {"tiers": {k: TIER_ORDER[c] for k, c in zip(STAT_KEYS, tiers)}, "stats": dict(zip(STAT_KEYS, stats)),
+            "weight_class": row[2], "specialization": row[3], "official": bool(row[1])}
+
+class RosterStore:
+    def __init__(self, path=ROSTER_DB_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        # the Tk app simulates on worker threads; all access is serialized through self.lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # ---- reads ----
+    def fetch(self, name):
+        # community row wins over an official row of the same name
+        with self.lock:
+            row = self.conn.execute(f"SELECT {PLAYER_COLS} FROM players WHERE name=? ORDER BY official LIMIT 1", (name,)).fetchone()
+        return None if row is None else row_to_record(row)
+
+    def load_official(self):
+        with self.lock:
+            rows = self.conn.execute(f"SELECT {PLAYER_COLS} FROM players WHERE official=1").fetchall()
+        return {r[0]: row_to_record(r) for r in rows}
+
+    def load_community(self):
+        with self.lock:
+            rows = self.conn.execute(f"SELECT {PLAYER_COLS} FROM players WHERE official=0").fetchall()
+        return {r[0]: row_to_record(r) for r in rows}
+
+    def load_shadowing(self):
+        # community rows that shadow an official row of the same name
+        with self.lock:
+            rows = self.conn.execute(f"SELECT {PLAYER_COLS} FROM players WHERE official=0 AND name IN "
+                                     "(SELECT name FROM players WHERE official=1)").fetchall()
+        return {r[0]: row_to_record(r) for r in rows}
+
+    def count(self, official=None):
+        with self.lock:
+            if official is None:
+                return self.conn.execute("SELECT COUNT(DISTINCT name) FROM players").fetchone()[0]
+            return self.conn.execute(f"SELECT COUNT(*) FROM players WHERE official=? AND {EFFECTIVE}", (1 if official else 0,)).fetchone()[0]
+
+    def find(self, official=None, weight_class=None, specialization=None, min_tiers=None, prefix=None, limit=None):
+        # names matching every given filter, sorted; min_tiers is {stat: tier} (e.g. {"power": "A"}).
+        # Filters apply to the row a name resolves to, so a shadowed official row never matches.
+        where = [EFFECTIVE]; args = []
+        if official is not None: where.append("official=?"); args.append(1 if official else 0)
+        if weight_class is not None: where.append("weight_class=?"); args.append(weight_class)
+        if specialization is not None: where.append("specialization=?"); args.append(specialization)
+        for k, t in (min_tiers or {}).items():
+            if k not in STAT_KEYS: raise ValueError(f"Unknown stat: {k}")
+            where.append(f"tier_{k}>=?"); args.append(tier_index_of(t))
+        if prefix: where.append("name>=? AND name<?"); args += [prefix, prefix + "\U0010ffff"]
+        sql = "SELECT name FROM players WHERE " + " AND ".join(where) + " ORDER BY name"
+        if limit is not None: sql += " LIMIT ?"; args.append(int(limit))
+        with self.lock:
+            return [r[0] for r in self.conn.execute(sql, args)]
+
+    def search(self, query, official=None, weight_class=None, specialization=None, limit=SEARCH_LIMIT):
+        # same ordering as NameIndex.search: official first, prefix before substring matches, by name.
+        # The filters are written as +col so SQLite walks the primary key in name order and stops at the
+        # limit instead of collecting every row of a filter index and sorting it.
+        q = query.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        where = ["+official=?", "name LIKE ? ESCAPE '\\'", EFFECTIVE]; extra = []
+        if weight_class is not None: where.append("+weight_class=?"); extra.append(weight_class)
+        if specialization is not None: where.append("+specialization=?"); extra.append(specialization)
+        sql = f"SELECT name FROM players WHERE {' AND '.join(where)} ORDER BY name LIMIT ?"
+        out = []
+        with self.lock:
+            for flag in ((True, False) if official is None else (official,)):
+                for pattern in ((q + "%", "%" + q + "%") if q else ("%",)):
+                    if len(out) >= limit: break
+                    rows = self.conn.execute(sql, [1 if flag else 0, pattern] + extra + [limit + len(out)])
+                    out.extend(r[0] for r in rows if r[0] not in out)
+        return out[:limit]
+
+    # ---- writes (each call is one transaction) ----
+    def _upsert(self, items, official):
+        rows = [record_to_row(name, rec, official) for name, rec in items]
+        if rows:
+            marks = ", ".join("?" * len(rows[0]))
+            self.conn.executemany(f"INSERT OR REPLACE INTO players ({PLAYER_COLS}) VALUES ({marks})", rows)
+
+    def upsert_many(self, items, official):
+        with self.lock, self.conn:
+            self._upsert(items, official)
+
+    def apply_community_changes(self, upserts, deletes):
+        with self.lock, self.conn:
+            self._upsert(upserts, False)
+            if deletes:
+                self.conn.executemany("DELETE FROM players WHERE name=? AND official=0", [(n,) for n in deletes])
+
+    # ---- JSON import / export ----
+    def import_json(self, official_file=OFFICIAL_PLAYERS_FILE, players_file=PLAYERS_FILE):
+        # replaces the database contents with the JSON roster (journal included)
+        official = load_official_players(official_file); community = load_community_players(players_file)
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM players")
+            self._upsert(official.items(), True)
+            self._upsert(community.items(), False)
+        return len(official), len(community)
+
+    def export_json(self, official_file=OFFICIAL_PLAYERS_FILE, players_file=PLAYERS_FILE):
+        save_official_players(self.load_official(), official_file)
+        save_community_players(self.load_community(), players_file)
+
+class SqliteRoster(Roster):
+    # Roster over a RosterStore: official players (and community rows shadowing one) in memory,
+    # other community players pulled in as they are used
+    def __init__(self, store):
+        self.store = store
+        self.missing = set()   # names known not to exist, so repeated misses skip the database
+        super().__init__(store.load_official(), store.load_shadowing(), official_file=None, players_file=None)
+
+    @classmethod
+    def open(cls, path=ROSTER_DB_FILE):
+        return cls(RosterStore(path))
+
+    def row_of(self, name):
+        i = self.table.index.get(name)
+        if i is not None or name in self.missing: return i
+        rec = self.store.fetch(name)
+        if rec is None or rec["official"]:
+            self.missing.add(name); return None
+        return self.table.upsert(name, rec, False)
+
+    def names(self, official=None):
+        return self.store.find(official=official)
+
+    def find(self, **filters):
+        return self.store.find(**filters)
+
+    def search(self, query, official=None, weight_class=None, specialization=None, limit=SEARCH_LIMIT):
+        return self.store.search(query, official, weight_class, specialization, limit)
+
+    def persist(self, names):
+        # one transaction for everything touched (a whole post-match drift, an add or a delete)
+        upserts = []; deletes = []
+        for name in dict.fromkeys(names):
+            self.missing.discard(name)
+            i = self.table.index.get(name)
+            if i is None or self.table.official[i]: deletes.append(name)
+            else: upserts.append((name, self.table.record(i)))
+        self.store.apply_community_changes(upserts, deletes)
+
+    def save_community(self):
+        # only rows loaded into memory can differ from the database
+        self.persist([n for n, i in self.table.index.items() if not self.table.official[i]])
+
+    def close(self):
+        self.store.close()
+
+    def __len__(self):
+        return self.store.count()
+
+def main(argv=None):
+    # python juniversus_sqlite.py import|export [db] — convert between the JSON files and the database
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in ("import", "export"):
+        print("usage: juniversus_sqlite.py import|export [roster.db]"); return 2
+    store = RosterStore(argv[1] if len(argv) > 1 else ROSTER_DB_FILE)
+    try:
+        if argv[0] == "import":
+            n_off, n_comm = store.import_json()
+            print(f"Imported {n_off} official and {n_comm} community players into {store.path}")
+        else:
+            store.export_json()
+            print(f"Exported {store.path} to {OFFICIAL_PLAYERS_FILE} and {PLAYERS_FILE}")
+    finally:
+        store.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+import os, random, sys
+
+import pytest
+
+# the juniversus_* modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from juniversus_engine import STAT_KEYS, WEIGHT_CLASSES, make_player_from_profile
+
+def random_player(rng):
+    return make_player_from_profile({k: rng.choice("DB") for k in STAT_KEYS}, rng.choice(WEIGHT_CLASSES))
+
+def edit(roster, rng, names, deletes=()):
+    # set these community players to fresh random records, then delete `deletes`
+    for name in names: roster.set_community_player(name, random_player(rng))
+    for name in deletes: roster.delete_community_player(name)
+
+def roster_records(roster):
+    # name -> full record, for comparing two loads of the same roster
+    return {n: roster.get(n) for n in roster.names()}
+
+@pytest.fixture
+def files(tmp_path):
+    # (official file, players file) in a scratch directory; the official file gets the defaults on first load
+    return str(tmp_path / "official_players.json"), str(tmp_path / "players.json")
+
+@pytest.fixture
+def rng():
+    return random.Random(1234)
@@ -0,0 +1,42 @@
+import collections, math
+
+from conftest import random_player
+from juniversus_engine import MULTISPORT_SPORTS, Roster, greedy_lineups, save_community_players, simulate_multisport_match
+from juniversus_batch import series_table, simulate_series_batch
+from juniversus_odds import win_probability
+
+LIVE = 4000
+
+def teams(files, rng):
+    off, pl = files
+    save_community_players({f"P{i}": random_player(rng) for i in range(20)}, pl)
+    roster = Roster.from_files(off, pl, snapshot=False)
+    picked = rng.sample(roster.names(), 16)
+    return roster, picked[:8], picked[8:]
+
+def test_series_table_uses_the_live_lineups(files, rng):
+    roster, team1, team2 = teams(files, rng)
+    sport_names, orders, probs = series_table(roster, team1, team2)
+    assert orders.shape == probs.shape and orders.shape[1] == MULTISPORT_SPORTS
+    for row in rng.sample(range(len(orders)), 25):
+        drawn = [sport_names[i] for i in orders[row]]
+        lineups = greedy_lineups(roster, drawn, team1, team2)
+        for j, (sport_name, (s1, s2)) in enumerate(zip(drawn, lineups)):
+            assert abs(probs[row, j] - win_probability(roster, sport_name, s1, s2)) < 1e-12
+
+def test_batch_matches_live_match_distribution(files, rng):
+    roster, team1, team2 = teams(files, rng)
+    batch = simulate_series_batch(roster, team1, team2, 200_000, seed=7)
+    wins = collections.Counter(); scores = collections.Counter(); played = collections.Counter()
+    for seed in range(LIVE):
+        result = simulate_multisport_match(roster, team1, team2, drift=False, seed=seed, narrate=False)
+        wins[result["winner"]] += 1; scores["%d-%d" % tuple(result["score"])] += 1
+        played.update(result["sports"][:sum(result["score"])])
+    def close(live_rate, batch_rate):
+        # within 4.5 standard errors of the live sample
+        return abs(live_rate - batch_rate) <= 4.5 * math.sqrt(max(batch_rate * (1 - batch_rate), 1e-4) / LIVE) + 1e-3
+    assert close(wins[1] / LIVE, batch["team1_win_rate"]) and close(wins[2] / LIVE, batch["team2_win_rate"])
+    for score in set(scores) | set(batch["score_distribution"]):
+        assert close(scores[score] / LIVE, batch["score_distribution"].get(score, 0.0)), score
+    for sport_name, rate in batch["sport_play_rates"].items():
+        assert close(played[sport_name] / LIVE, rate), sport_name
@@ -0,0 +1,22 @@
+import random
+
+from conftest import random_player
+from juniversus_engine import MatchRNG, Roster, post_match_tier_drift
+
+def plain(rng):
+    # the same stream as rng, without spawn()
+    r = random.Random(); r.setstate(rng.getstate())
+    return r
+
+def test_player_on_both_sides_drifts_on_separate_streams(files, rng):
+    off, pl = files
+    both = Roster.from_files(off, pl, snapshot=False); steps = Roster.from_files(off, pl, snapshot=False)
+    for seed in range(20):
+        player = random_player(rng)
+        both.set_community_player("X", dict(player)); steps.set_community_player("X", dict(player))
+        match = MatchRNG(seed)
+        post_match_tier_drift(both, ["X"], ["X"], "Multisport", rng=match)
+        post_match_tier_drift(steps, ["X"], [], "Multisport", rng=plain(match.spawn("player", 0, "X")))
+        post_match_tier_drift(steps, [], ["X"], "Multisport", rng=plain(match.spawn("player", 1, "X")))
+        assert both.get("X") == steps.get("X")
+    assert MatchRNG(0).spawn("player", 0, "X").random() != MatchRNG(0).spawn("player", 1, "X").random()
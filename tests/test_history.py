@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from conftest import random_player
+from juniversus_engine import NUM_STATS, Roster, save_community_players
+from juniversus_history import CHUNKS_FILE, DATA_FILE, HistoryReader, HistoryWriter
+
+@pytest.fixture
+def roster(rng):
+    return Roster({}, {f"P{i}": random_player(rng) for i in range(30)}, official_file=None, players_file=None)
+
+def run_steps(roster, writer, rng, steps, expected):
+    # each change through the roster is one step; the attached writer records it
+    t = roster.table
+    for _ in range(steps):
+        name = rng.choice(roster.names())
+        roster.set_community_player(name, random_player(rng))
+        i = roster.row_of(name)
+        expected.setdefault(name, []).append((writer.step - 1, list(t.stat_row(i)), list(t.tier_row(i)), t.spec_names[t.spec[i]]))
+
+def check(path, expected, first_step=0, last_step=None):
+    with HistoryReader(path) as h:
+        for name, rows in expected.items():
+            rows = [r for r in rows if r[0] >= first_step and (last_step is None or r[0] <= last_step)]
+            t = h.trajectory(name, first_step, last_step)
+            assert t["steps"].tolist() == [r[0] for r in rows]
+            assert t["stats"].reshape(-1, NUM_STATS).tolist() == [r[1] for r in rows]
+            assert t["tiers"].reshape(-1, NUM_STATS).tolist() == [r[2] for r in rows]
+            assert [h.spec_names[c] for c in t["spec"]] == [r[3] for r in rows]
+
+def test_round_trip_across_chunks_and_reopen(tmp_path, roster, rng):
+    path = str(tmp_path / "history"); expected = {}
+    with HistoryWriter(path, roster, chunk_records=9).attach() as w: run_steps(roster, w, rng, 40, expected)
+    with HistoryWriter(path, roster, chunk_records=9).attach() as w:
+        assert w.step == 40
+        run_steps(roster, w, rng, 25, expected)
+    check(path, expected)
+    check(path, expected, first_step=20, last_step=50)
+    with HistoryReader(path) as h:
+        assert len(h) == 65 and h.steps == 65
+        assert h.trajectory("nobody")["steps"].size == 0
+
+def test_torn_chunk_entry(tmp_path, roster, rng):
+    path = str(tmp_path / "history"); expected = {}
+    with HistoryWriter(path, roster, chunk_records=10).attach() as w: run_steps(roster, w, rng, 30, expected)
+    chunks = os.path.join(path, CHUNKS_FILE)
+    with open(chunks, "r+b") as f: f.truncate(os.path.getsize(chunks) - 5)  # crash mid-entry: the last chunk is lost
+    with HistoryReader(path) as h:
+        kept = max(c[4] for c in h.chunks)
+    expected = {n: [r for r in rows if r[0] <= kept] for n, rows in expected.items()}
+    check(path, expected)
+    # the writer cuts the partial entry off and appends in step again
+    with HistoryWriter(path, roster, chunk_records=10).attach() as w: run_steps(roster, w, rng, 10, expected)
+    check(path, expected)
+
+def test_torn_chunk_data(tmp_path, roster, rng):
+    path = str(tmp_path / "history"); expected = {}
+    with HistoryWriter(path, roster, chunk_records=10).attach() as w: run_steps(roster, w, rng, 30, expected)
+    data = os.path.join(path, DATA_FILE)
+    with open(data, "r+b") as f: f.truncate(os.path.getsize(data) - 3)
+    with HistoryReader(path) as h:
+        kept = max(c[4] for c in h.chunks)
+        assert len(h) < 30
+    check(path, {n: [r for r in rows if r[0] <= kept] for n, rows in expected.items()})
+
+def test_reopen_across_a_reload_that_shifts_rows(tmp_path, files, rng):
+    off, pl = files
+    save_community_players({f"P{i}": random_player(rng) for i in range(30)}, pl)
+    path = str(tmp_path / "history"); expected = {}
+    roster = Roster.from_files(off, pl, snapshot=False)
+    with HistoryWriter(path, roster).attach() as w: run_steps(roster, w, rng, 20, expected)
+    roster.delete_community_player("P0")   # saved to players.json: every later row moves up on reload
+    expected.pop("P0", None)
+    roster = Roster.from_files(off, pl, snapshot=False)
+    seen = []
+    with HistoryWriter(path, roster).attach() as w:
+        roster.subscribe(lambda version, names: seen.append(names))  # notified after the writer
+        run_steps(roster, w, rng, 20, expected)
+        roster.set_community_player("P1", random_player(rng))
+        i = roster.row_of("P1"); t = roster.table
+        expected.setdefault("P1", []).append((w.step - 1, list(t.stat_row(i)), list(t.tier_row(i)), t.spec_names[t.spec[i]]))
+    assert len(seen) == 21
+    check(path, expected)
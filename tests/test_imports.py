@@ -0,0 +1,10 @@
+import os, subprocess, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_modules_load_without_numpy():
+    # NumPy is imported on first use, not when the engine (or a module the GUI loads) is imported
+    code = ("import sys, juniversus_engine, juniversus_odds, juniversus_lineup, juniversus_sqlite, "
+            "juniversus_batch, juniversus_history, juniversus_replay; print('numpy' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
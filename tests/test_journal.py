@@ -0,0 +1,85 @@
+import os, random, sys, threading
+
+from conftest import edit, random_player, roster_records
+from juniversus_engine import JOURNAL_SUFFIX, Roster, load_community_players
+
+def test_replay_skips_torn_last_line(files, rng):
+    off, pl = files
+    roster = Roster.from_files(off, pl, journaled=True, snapshot=False)
+    edit(roster, rng, ["A", "B"])
+    expected = dict(roster.community.items())
+    edit(roster, rng, ["C"])
+    roster.close()
+    journal = pl + JOURNAL_SUFFIX
+    with open(journal, "r+b") as f: f.truncate(os.path.getsize(journal) - 7)  # crash mid-append of C
+    assert load_community_players(pl) == expected
+
+def test_append_after_torn_tail(files, rng):
+    off, pl = files
+    roster = Roster.from_files(off, pl, journaled=True, snapshot=False)
+    edit(roster, rng, ["A", "B"])
+    roster.close()
+    journal = pl + JOURNAL_SUFFIX
+    with open(journal, "r+b") as f: f.truncate(os.path.getsize(journal) - 7)
+    roster = Roster.from_files(off, pl, journaled=True, snapshot=False)
+    assert "B" not in roster
+    edit(roster, rng, ["C"], deletes=["A"])
+    expected = roster_records(roster)
+    roster.close()
+    assert roster_records(Roster.from_files(off, pl, snapshot=False)) == expected
+
+def test_compaction_round_trip(files, rng):
+    off, pl = files
+    roster = Roster.from_files(off, pl, journaled=True, snapshot=False)
+    roster.journal.compact_bytes = 4096
+    official = roster.names(True)[0]
+    for step in range(200):
+        edit(roster, rng, [f"P{step % 23}"], deletes=[f"P{(step * 7) % 23}"] if step % 5 == 0 else ())
+    edit(roster, rng, [official])  # a community entry shadowing an official player
+    expected = roster_records(roster)
+    roster.close()
+    assert roster.journal.generation > 0
+    assert not os.path.exists(pl + JOURNAL_SUFFIX + ".old")
+    assert roster_records(Roster.from_files(off, pl, snapshot=False)) == expected
+
+def test_interrupted_compaction_is_finished_on_open(files, rng):
+    off, pl = files
+    roster = Roster.from_files(off, pl, journaled=True, snapshot=False)
+    edit(roster, rng, ["A", "B", "C"])
+    roster.journal.flush()
+    # crash after the rotation, before players.json was rewritten; later appends went to a new journal
+    os.replace(pl + JOURNAL_SUFFIX, pl + JOURNAL_SUFFIX + ".old")
+    roster.journal.f.close(); roster.journal.f = open(pl + JOURNAL_SUFFIX, "a", encoding="utf-8")
+    edit(roster, rng, ["D"], deletes=["B"])
+    expected = roster_records(roster)
+    roster.journal.flush(); roster.journal.f.close()
+    reopened = Roster.from_files(off, pl, journaled=True, snapshot=False)
+    reopened.close()
+    assert not os.path.exists(pl + JOURNAL_SUFFIX + ".old")
+    assert roster_records(reopened) == expected
+    assert roster_records(Roster.from_files(off, pl, snapshot=False)) == expected
+
+def test_compaction_while_players_are_deleted(files, rng):
+    off, pl = files
+    roster = Roster.from_files(off, pl, journaled=True, snapshot=False)
+    names = [f"P{i}" for i in range(2000)]
+    edit(roster, rng, names)
+    stop = threading.Event()
+    interval = sys.getswitchinterval(); sys.setswitchinterval(1e-6)  # interleave the threads finely
+    def churn():
+        # another thread deleting and re-adding players while snapshots are copied and written
+        r = random.Random(5)
+        while not stop.is_set():
+            name = r.choice(names)
+            if name in roster: roster.delete_community_player(name)
+            else: roster.set_community_player(name, random_player(r))
+    t = threading.Thread(target=churn); t.start()
+    try:
+        for _ in range(10):
+            roster.journal.compact(roster).join()
+            assert not os.path.exists(pl + JOURNAL_SUFFIX + ".old")
+    finally:
+        stop.set(); t.join(); sys.setswitchinterval(interval)
+    expected = roster_records(roster)
+    roster.close()
+    assert roster_records(Roster.from_files(off, pl, snapshot=False)) == expected
@@ -0,0 +1,34 @@
+import itertools
+
+from juniversus_lineup import min_cost_assignment
+
+def brute_force(candidates, slots, usage_limit):
+    # (players placed, total value) of the best assignment: as many slots filled as possible, then most value
+    options = []
+    for cand, size in zip(candidates, slots):
+        options.append([c for k in range(min(size, len(cand)) + 1) for c in itertools.combinations(cand, k)])
+    best = (0, 0.0)
+    for choice in itertools.product(*options):
+        used = {}
+        for sel in choice:
+            for p, _ in sel: used[p] = used.get(p, 0) + 1
+        if any(u > usage_limit for u in used.values()): continue
+        best = max(best, (sum(len(sel) for sel in choice), sum(v for sel in choice for _, v in sel)))
+    return best
+
+def test_matches_brute_force(rng):
+    for _ in range(60):
+        players = [f"P{i}" for i in range(rng.randint(2, 5))]
+        k = rng.randint(1, 3)
+        slots = [rng.randint(1, 2) for _ in range(k)]
+        candidates = [[(p, round(rng.uniform(1, 10), 3)) for p in rng.sample(players, rng.randint(1, len(players)))] for _ in range(k)]
+        limit = rng.randint(1, 2)
+        lineups = min_cost_assignment(candidates, slots, limit)
+        values = [dict(cand) for cand in candidates]
+        for sel, size, vals in zip(lineups, slots, values):
+            assert len(sel) <= size and len(set(sel)) == len(sel) and all(p in vals for p in sel)
+        used = [p for sel in lineups for p in sel]
+        assert all(used.count(p) <= limit for p in used)
+        placed, total = brute_force(candidates, slots, limit)
+        assert len(used) == placed
+        assert abs(sum(vals[p] for sel, vals in zip(lineups, values) for p in sel) - total) < 1e-9
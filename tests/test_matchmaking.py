@@ -0,0 +1,52 @@
+import itertools
+
+from conftest import edit, random_player
+from juniversus_engine import NUM_STATS, MatchRNG, Roster, post_match_tier_drift, save_community_players
+from juniversus_matchmaking import Matchmaker, RatingIndex, balanced_split, greedy_split
+
+def best_gap(ratings, size):
+    total = sum(ratings.values())
+    return min(abs(2 * sum(ratings[p] for p in c) - total) for c in itertools.combinations(ratings, size))
+
+def test_balanced_split_beats_greedy_on_small_rosters(rng):
+    for _ in range(300):
+        n = rng.randint(1, 12); size = rng.randint(0, n) if rng.random() < 0.3 else n // 2
+        ratings = {f"P{i}": round(rng.uniform(20, 90), rng.choice((0, 2))) for i in range(n)}
+        side1, side2, gap = balanced_split(ratings, size)
+        assert len(side1) == size and sorted(side1 + side2) == sorted(ratings)
+        assert abs(gap - abs(sum(ratings[p] for p in side1) - sum(ratings[p] for p in side2))) < 1e-9
+        assert abs(gap - best_gap(ratings, size)) < 1e-9
+        names = sorted(ratings, key=lambda p: (-ratings[p], p))
+        greedy = greedy_split(names, ratings, size, sum(ratings.values()))
+        assert len(greedy) == size
+        assert gap <= abs(2 * sum(ratings[p] for p in greedy) - sum(ratings.values())) + 1e-9
+
+def check_index(idx, roster, sport_name):
+    fresh = RatingIndex(roster, sport_name, idx.official)
+    assert idx.entries == fresh.entries and idx.ratings == fresh.ratings
+    for target in [r + d for r, _ in fresh.entries[::7] for d in (-0.5, 0.0, 0.5)]:
+        by_distance = sorted(fresh.entries, key=lambda e: abs(e[0] - target))
+        assert sorted(abs(r - target) for _, r in idx.closest(target, 5)) == sorted(abs(r - target) for r, _ in by_distance[:5])
+
+def test_index_follows_drift_edits_and_refresh(files, rng):
+    off, pl = files
+    save_community_players({f"P{i}": random_player(rng) for i in range(40)}, pl)
+    roster = Roster.from_files(off, pl, snapshot=False)
+    mm = Matchmaker(roster, official=False)
+    sport_names = ["Basketball", "Tennis"]
+    for sport_name in sport_names: mm.index(sport_name)
+    community = roster.names(False)
+    for seed in range(20):
+        players = rng.sample(community, 12)
+        post_match_tier_drift(roster, players[:6], players[6:], "Multisport", set(players[:2]), rng=MatchRNG(seed))
+        for sport_name in sport_names: check_index(mm.index(sport_name), roster, sport_name)
+    edit(roster, rng, ["NEW1", "NEW2"], deletes=["P0", "P1"])
+    for sport_name in sport_names:
+        idx = mm.index(sport_name)
+        assert "NEW1" in idx.ratings and "P0" not in idx.ratings
+        check_index(idx, roster, sport_name)
+    for name in roster.names(False)[:10]:
+        roster.table.stats[roster.row_of(name) * NUM_STATS] = 1
+    roster.refresh()   # bulk edit: indexes rebuild on next use
+    for sport_name in sport_names: check_index(mm.index(sport_name), roster, sport_name)
+    mm.close()
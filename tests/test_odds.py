@@ -0,0 +1,37 @@
+import bisect
+
+from juniversus_engine import Roster, sports
+from juniversus_odds import noise_width, prob_from_gap, side_rating, win_probabilities, win_probability, win_probability_matrix
+
+GRID = 2000
+
+def brute_force(gap, width, n=GRID):
+    # share of an n x n midpoint grid of rolls (u1, u2) in [-width, width]^2 where gap + u1 > u2
+    rolls = [-width + (k + 0.5) * 2.0 * width / n for k in range(n)]
+    return sum(bisect.bisect_left(rolls, gap + u1) for u1 in rolls) / (n * n)
+
+def test_prob_from_gap_matches_enumeration():
+    for width in (10, 12):
+        span = 2.0 * width
+        for gap in (0.0, 0.5, -0.5, 3.7, -3.7, width, -width, span - 0.25, -(span - 0.25), span, -span, span + 5, -(span + 5), 1e9, -1e9):
+            assert abs(prob_from_gap(gap, width) - brute_force(gap, width)) < 1e-3, (gap, width)
+        assert prob_from_gap(0.0, width) == 0.5
+        assert prob_from_gap(span, width) == 1.0 and prob_from_gap(-span, width) == 0.0
+        for gap in (0.3, 4.0, 11.0, 19.9):
+            assert abs(prob_from_gap(gap, width) + prob_from_gap(-gap, width) - 1.0) < 1e-12
+
+def test_win_probability_matches_enumeration(files, rng):
+    off, pl = files
+    roster = Roster.from_files(off, pl, snapshot=False)
+    names = roster.names()
+    for sport_name, cfg in sports.items():
+        size = cfg.get("team_size", 1) if cfg["type"] == "team" else 1
+        for _ in range(3):
+            side1, side2 = rng.sample(names, size), rng.sample(names, size)
+            gap = side_rating(roster, sport_name, side1) - side_rating(roster, sport_name, side2)
+            p = win_probability(roster, sport_name, side1, side2)
+            assert abs(p - brute_force(gap, noise_width(sport_name), 400)) < 5e-3
+            assert win_probabilities(roster, sport_name, [(side1, side2)])[0] == p
+            assert abs(win_probability_matrix(roster, sport_name, [side1], [side2])[0][0] - p) < 1e-12
+        # a side against itself is a tie on ratings
+        assert win_probability(roster, sport_name, side1, side1) == 0.5
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from conftest import random_player
+from juniversus_engine import EventRecorder, Roster, TeeSink, save_community_players, simulate_multisport_match
+from juniversus_replay import HEADER, MATCH_RECORD, MATCHES_FILE, ReplayReader, ReplayWriter
+
+@pytest.fixture
+def roster(rng):
+    return Roster({}, {f"P{i}": random_player(rng) for i in range(28)}, official_file=None, players_file=None)
+
+def play(roster, writer, seeds):
+    # what the reader should give back for each match
+    out = []
+    for seed in seeds:
+        names = roster.names()
+        k = seed % len(names)
+        team1 = (names[k:] + names[:k])[:7]; team2 = (names[k:] + names[:k])[7:14]
+        rec = EventRecorder()
+        res = simulate_multisport_match(roster, team1, team2, sink=TeeSink(writer, rec), seed=seed, narrate=False)
+        events = rec.transcript  # includes the post-match drift events
+        out.append({"seed": seed, "score": tuple(res["score"]), "winner": res["winner"],
+                    "lineups": [(ev["side1"], ev["side2"]) for ev in events if ev["type"] == "sport_start"],
+                    "drift": [ev["player"] for ev in events if ev["type"] == "drift"]})
+    return out
+
+def read_back(path):
+    with ReplayReader(path) as r:
+        return [{"seed": m["seed"], "score": m["score"], "winner": m["winner"],
+                 "lineups": [(list(a), list(b)) for a, b in m["lineups"]],
+                 "drift": [d["player"] for d in m["drift"]]} for m in r], r.drift_n
+
+def test_round_trip_and_reopen(tmp_path, roster):
+    path = str(tmp_path / "season")
+    with ReplayWriter(path, roster) as w: expected = play(roster, w, range(1, 13))
+    with ReplayWriter(path, roster) as w: expected += play(roster, w, range(13, 21))
+    got, drift_n = read_back(path)
+    assert got == expected
+    assert drift_n == sum(len(m["drift"]) for m in expected)
+    with ReplayReader(path) as r:
+        assert r[5]["seed"] == expected[5]["seed"] and r[-1]["seed"] == expected[-1]["seed"]
+        assert int(r.columns()["score"].sum()) == sum(sum(m["score"]) for m in expected)
+
+def test_torn_match_record(tmp_path, roster):
+    path = str(tmp_path / "season")
+    with ReplayWriter(path, roster) as w: expected = play(roster, w, range(1, 9))
+    matches = os.path.join(path, MATCHES_FILE)
+    with open(matches, "r+b") as f: f.truncate(os.path.getsize(matches) - 10)  # crash mid-record
+    got, drift_n = read_back(path)
+    assert got == expected[:-1]
+    assert drift_n == sum(len(m["drift"]) for m in expected[:-1])
+    # the writer drops the torn match and its drift, then appends in step again
+    with ReplayWriter(path, roster) as w: more = play(roster, w, range(9, 12))
+    assert read_back(path)[0] == expected[:-1] + more
+
+def test_drift_without_match_record(tmp_path, roster):
+    path = str(tmp_path / "season")
+    with ReplayWriter(path, roster) as w: expected = play(roster, w, range(1, 9))
+    assert expected[-1]["drift"]
+    # crash after the last match's drift records, before its match record
+    with open(os.path.join(path, MATCHES_FILE), "r+b") as f: f.truncate(HEADER.size + 7 * MATCH_RECORD.size)
+    got, drift_n = read_back(path)
+    assert got == expected[:-1]
+    assert drift_n == sum(len(m["drift"]) for m in expected[:-1])
+    with ReplayWriter(path, roster) as w: more = play(roster, w, range(9, 12))
+    assert read_back(path)[0] == expected[:-1] + more
+
+def test_reopen_across_a_reload_that_shifts_rows(tmp_path, files, rng):
+    off, pl = files
+    save_community_players({f"P{i}": random_player(rng) for i in range(28)}, pl)
+    path = str(tmp_path / "season")
+    roster = Roster.from_files(off, pl, snapshot=False)
+    with ReplayWriter(path, roster) as w: expected = play(roster, w, range(1, 6))
+    roster.delete_community_player(roster.names(False)[0])   # saved: later rows move up on reload
+    roster = Roster.from_files(off, pl, snapshot=False)
+    with ReplayWriter(path, roster) as w: expected += play(roster, w, range(6, 11))
+    assert read_back(path)[0] == expected
+
+def test_writer_alone_skips_the_play_by_play(tmp_path, roster):
+    with ReplayWriter(str(tmp_path / "season"), roster) as w:
+        res = simulate_multisport_match(roster, roster.names()[:7], roster.names()[7:14], sink=w, seed=3)
+        assert not w.narrates and TeeSink(w, EventRecorder()).narrates
+    assert not any(ev["type"] == "narrative" for ev in res["transcript"])
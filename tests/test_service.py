@@ -0,0 +1,71 @@
+import asyncio, threading
+
+import pytest
+
+import juniversus_service
+from conftest import random_player, roster_records
+from juniversus_engine import Roster, save_community_players
+from juniversus_odds import win_probability
+from juniversus_service import SimulationService, run_job
+
+def community_roster(files, rng, journaled=False):
+    off, pl = files
+    save_community_players({f"P{i}": random_player(rng) for i in range(30)}, pl)
+    return Roster.from_files(off, pl, journaled=journaled, snapshot=False)
+
+def record_calls(monkeypatch, fn_name, calls):
+    fn = getattr(juniversus_service, fn_name)
+    def wrapper(roster, items):
+        calls.append(list(items)); return fn(roster, items)
+    monkeypatch.setattr(juniversus_service, fn_name, wrapper)
+
+def test_concurrent_requests_share_batches(files, rng, monkeypatch):
+    roster = community_roster(files, rng)
+    ref = Roster.from_files(*files, snapshot=False)
+    odds_calls = []; sim_calls = []
+    record_calls(monkeypatch, "odds_for", odds_calls); record_calls(monkeypatch, "run_jobs", sim_calls)
+    names = roster.names()
+    pairs = [rng.sample(names, 2) for _ in range(40)]
+    async def go():
+        service = SimulationService(roster, workers=0, window=0.2, max_batch=16)
+        await service.start(port=0)
+        try:
+            odds = await asyncio.gather(*(service.post_odds({"sport": "Tennis", "side1": a, "side2": b}) for a, b in pairs))
+            sims = await asyncio.gather(*(service.post_match({"sport": "Tennis", "side1": a, "side2": b, "seed": k}) for k, (a, b) in enumerate(pairs)))
+        finally:
+            await service.close()
+        return odds, sims
+    odds, sims = asyncio.run(go())
+    for sizes in ([len(c) for c in odds_calls], [len(c) for c in sim_calls]):
+        assert sum(sizes) == len(pairs) and max(sizes) <= 16 and len(sizes) < len(pairs) // 4
+    assert [o["p1"] for o in odds] == pytest.approx([win_probability(ref, "Tennis", a, b) for a, b in pairs], abs=1e-12)
+    assert sims == [run_job(ref, ("match", "Tennis", [a], [b], k, False)) for k, (a, b) in enumerate(pairs)]
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_drift_has_a_single_writer_in_arrival_order(files, rng, monkeypatch, workers):
+    roster = community_roster(files, rng, journaled=True)
+    ref = Roster.from_files(*files, snapshot=False)
+    writers = set(); applied = []; active = [0]
+    roster.subscribe(lambda version, names: writers.add(threading.current_thread().name))
+    apply_drifts = juniversus_service.apply_drifts
+    def recording(r, items):
+        active[0] += 1; assert active[0] == 1   # never two drift batches at once
+        try: applied.extend(items); apply_drifts(r, items)
+        finally: active[0] -= 1
+    monkeypatch.setattr(juniversus_service, "apply_drifts", recording)
+    community = roster.names(False)
+    fixtures = [rng.sample(community, 12) for _ in range(30)]
+    async def go():
+        service = SimulationService(roster, workers=workers)
+        await service.start(port=0)
+        try:
+            return await asyncio.gather(*(service.post_multisport({"team1": p[:6], "team2": p[6:], "seed": k}) for k, p in enumerate(fixtures)))
+        finally:
+            await service.close()
+    results = asyncio.run(go())
+    assert writers and all(name.startswith("roster") for name in writers)
+    assert len(applied) == sum(1 for res in results if res["winner"])
+    # replaying the writer's order on a fresh copy gives the same roster, in memory and on disk
+    apply_drifts(ref, applied)
+    assert roster_records(roster) == roster_records(ref)
+    assert roster_records(Roster.from_files(*files, journaled=True, snapshot=False)) == roster_records(ref)
@@ -0,0 +1,61 @@
+import os
+
+from conftest import edit, random_player, roster_records
+from juniversus_engine import (
+    JOURNAL_SUFFIX, SNAPSHOT_SUFFIX, Roster, load_roster_snapshot, load_community_players, save_community_players,
+)
+
+def seeded(files, rng):
+    # a roster with community players and a snapshot on disk
+    off, pl = files
+    save_community_players({f"P{i}": random_player(rng) for i in range(40)}, pl)
+    Roster.from_files(off, pl).close()
+    assert os.path.exists(pl + SNAPSHOT_SUFFIX)
+
+def test_snapshot_plus_journal_tail_equals_json_load(files, rng):
+    off, pl = files
+    seeded(files, rng)
+    roster = Roster.from_files(off, pl, journaled=True)
+    edit(roster, rng, ["P3", "NEW", roster.names(True)[0]], deletes=["P5", "P7"])
+    roster.close()
+    expected = roster_records(Roster.from_files(off, pl, snapshot=False))
+    for verify in (False, True):
+        snap = load_roster_snapshot(Roster, off, pl, verify=verify)
+        assert snap is not None
+        assert roster_records(snap) == expected
+        assert snap.official == Roster.from_files(off, pl, snapshot=False).official
+
+def test_snapshot_with_torn_journal_tail(files, rng):
+    off, pl = files
+    seeded(files, rng)
+    roster = Roster.from_files(off, pl, journaled=True)
+    edit(roster, rng, ["P1", "P2"])
+    roster.close()
+    journal = pl + JOURNAL_SUFFIX
+    with open(journal, "r+b") as f: f.truncate(os.path.getsize(journal) - 5)
+    snap = load_roster_snapshot(Roster, off, pl)
+    assert snap is not None
+    assert roster_records(snap) == roster_records(Roster.from_files(off, pl, snapshot=False))
+
+def test_rewritten_players_file_makes_snapshot_stale(files, rng):
+    off, pl = files
+    seeded(files, rng)
+    data = load_community_players(pl)
+    del data["P0"]; data["OTHER"] = random_player(rng)
+    save_community_players(data, pl)
+    assert load_roster_snapshot(Roster, off, pl) is None
+    roster = Roster.from_files(off, pl)   # falls back to JSON and writes a fresh snapshot
+    assert "OTHER" in roster and "P0" not in roster
+    snap = load_roster_snapshot(Roster, off, pl)
+    assert snap is not None and roster_records(snap) == roster_records(roster)
+
+def test_compaction_after_snapshot(files, rng):
+    off, pl = files
+    seeded(files, rng)
+    roster = Roster.from_files(off, pl, journaled=True)
+    roster.journal.compact_bytes = 2048
+    for step in range(60): edit(roster, rng, [f"P{step % 11}"])
+    roster.close()
+    assert roster.journal.generation > 0
+    expected = roster_records(Roster.from_files(off, pl, snapshot=False))
+    assert roster_records(Roster.from_files(off, pl)) == expected
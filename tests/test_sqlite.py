@@ -0,0 +1,26 @@
+from conftest import random_player, roster_records
+from juniversus_engine import Roster, save_community_players
+from juniversus_sqlite import RosterStore, SqliteRoster
+
+def test_parity_with_roster_when_community_shadows_official(files, tmp_path, rng):
+    off, pl = files
+    official = Roster.from_files(off, pl, snapshot=False).names(True)   # writes the default official file
+    community = {f"P{i}": random_player(rng) for i in range(30)}
+    for name in rng.sample(official, 5): community[name] = random_player(rng)
+    save_community_players(community, pl)
+    roster = Roster.from_files(off, pl, snapshot=False)
+    store = RosterStore(str(tmp_path / "roster.db")); store.import_json(off, pl)
+    db = SqliteRoster(store)
+    for flag in (None, True, False):
+        assert db.names(flag) == sorted(roster.names(flag))
+        assert db.store.count(flag) == len(roster.names(flag))
+        for query in ("", "a", "P1"):
+            assert db.search(query, official=flag, limit=500) == roster.search(query, official=flag, limit=500)
+    wcs = {rec["weight_class"] for rec in roster_records(roster).values()}
+    for wc in wcs:
+        for flag in (None, True, False):
+            expect = sorted(n for n in roster.names(flag) if roster.get(n)["weight_class"] == wc)
+            assert db.find(official=flag, weight_class=wc) == expect
+    assert len(db) == len(roster)
+    assert {n: db.get(n) for n in roster.names()} == roster_records(roster)
+    db.close()
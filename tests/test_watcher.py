@@ -0,0 +1,36 @@
+import json
+
+from conftest import random_player
+from juniversus_engine import JOURNAL_SUFFIX, PlayersFileWatcher, Roster, save_community_players
+
+def test_read_diffs_without_applying(files, rng):
+    off, pl = files
+    save_community_players({f"P{i}": random_player(rng) for i in range(10)}, pl)
+    roster = Roster.from_files(off, pl, journaled=True, snapshot=False)
+    watcher = PlayersFileWatcher(roster)
+    # another process appends to the journal
+    with open(pl + JOURNAL_SUFFIX, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"n": "EXT", "t": "BBBBBBB", "s": [4] * 7}) + "\n" + json.dumps({"n": "P3", "del": 1}) + "\n")
+    version = roster.version
+    upserts, deletes = watcher.read()
+    assert list(upserts) == ["EXT"] and deletes == ["P3"]
+    assert roster.version == version and "EXT" not in roster and "P3" in roster
+    assert roster.apply_external(upserts, deletes) == ["EXT", "P3"]
+    assert "EXT" in roster and "P3" not in roster
+    assert watcher.poll() == []
+    roster.close()
+
+def test_own_compaction_is_not_an_external_change(files, rng):
+    off, pl = files
+    roster = Roster.from_files(off, pl, journaled=True, snapshot=False)
+    roster.journal.compact_bytes = 2048
+    watcher = PlayersFileWatcher(roster)
+    resyncs = []
+    resync = watcher.resync
+    watcher.resync = lambda: resyncs.append(1) or resync()
+    for step in range(80):
+        roster.set_community_player(f"P{step % 9}", random_player(rng))
+        if roster.journal.compactor is not None: roster.journal.compactor.join()
+        assert watcher.read() == ({}, [])
+    roster.close()
+    assert roster.journal.generation > 0 and not resyncs